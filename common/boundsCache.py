@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import itertools
+
+import numpy as np
+
+from . import meshGeometry
+
+#メッシュごとのオブジェクト空間のバウンディングボックスのキャッシュ
+#ワールド空間のバウンディングボックスは、キャッシュした箱の8つの角をワールド行列で変換して計算する(頂点は読まない)
+#形状が変わった場合(meshGeometry.getGeometryVersion)だけ取得し直すので、移動・回転・スケールしただけなら問い合わせは行列だけになる
+#回転している場合は頂点から求めた箱(exactWorldBoundingBox)より大きくなることがある
+
+#箱の8つの角 --> (最小値0/最大値1)の組み合わせ(8,3)
+_CORNERS = np.array(list(itertools.product((0, 1), repeat=3)), dtype=np.int64)
+
+#---------------------------------------.
+# オブジェクト空間の箱をまとめてワールド空間の箱に変換.
+# @param[in] boxes --> (N,2,3) [[最小値], [最大値]].
+# @param[in] matrices --> ワールド行列(N,4,4) (Mayaの行ベクトル形式).
+# @return (N,6) [xmin, ymin, zmin, xmax, ymax, zmax].
+#---------------------------------------.
+def transformBoxes(boxes, matrices):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 2, 3)
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    corners = boxes[:, _CORNERS, np.arange(3)]#(N,8,3)
+    world = np.einsum('nci,nij->ncj', corners, matrices[:, :3, :3]) + matrices[:, np.newaxis, 3, :3]
+    return np.concatenate([world.min(axis=1), world.max(axis=1)], axis=1)
+
+#---------------------------------------.
+# オブジェクト空間のバウンディングボックスのキャッシュ.
+#---------------------------------------.
+class BoundsCache(object):
+    def __init__(self):
+        #メッシュ名 --> (形状の変更番号, (2,3))
+        self._boxes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._boxes)
+
+    #---------------------------------------.
+    # オブジェクト空間のバウンディングボックスを取得. 形状が変わっていなければキャッシュを返す.
+    # @param[in] mesh --> メッシュ名.
+    # @return (2,3) [[最小値], [最大値]].
+    #---------------------------------------.
+    def localBox(self, mesh):
+        version = meshGeometry.getGeometryVersion(mesh)
+        entry = self._boxes.get(mesh)
+        if entry is not None and version is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        box = np.array(meshGeometry.getLocalBoundingBox(mesh), dtype=np.float64).reshape(2, 3)
+        if version is None:
+            self._boxes.pop(mesh, None)
+        else:
+            self._boxes[mesh] = (version, box)
+        return box
+
+    #---------------------------------------.
+    # ワールド空間のバウンディングボックスをまとめて計算.
+    # @param[in] meshes --> メッシュ名のリスト.
+    # @return (N,6) [xmin, ymin, zmin, xmax, ymax, zmax].
+    #---------------------------------------.
+    def worldBoxes(self, meshes):
+        if not meshes:
+            return np.zeros((0, 6))
+        boxes = np.array([self.localBox(mesh) for mesh in meshes])
+        matrices = np.array([meshGeometry.getWorldMatrix(mesh) for mesh in meshes])
+        return transformBoxes(boxes, matrices)
+
+    #---------------------------------------.
+    # キャッシュを捨てる.
+    # @param[in] mesh --> メッシュ名. Noneの場合はすべて.
+    #---------------------------------------.
+    def invalidate(self, mesh=None):
+        if mesh is None:
+            self._boxes.clear()
+        else:
+            self._boxes.pop(mesh, None)
+
+    #---------------------------------------.
+    # 統計情報.
+    # @return {'entries', 'hits', 'misses'}.
+    #---------------------------------------.
+    def stats(self):
+        return {'entries': len(self._boxes), 'hits': self.hits, 'misses': self.misses}
+
+_cache = [BoundsCache()]
+
+#---------------------------------------.
+# 共有のキャッシュを取得.
+# @return BoundsCache.
+#---------------------------------------.
+def getCache():
+    return _cache[0]
+
+#---------------------------------------.
+# 共有のキャッシュを差し替える.
+# @param[in] cache --> BoundsCache.
+#---------------------------------------.
+def setCache(cache):
+    _cache[0] = cache
+
+#---------------------------------------.
+# ワールド空間のバウンディングボックスをまとめて計算(キャッシュした箱と行列から).
+# @param[in] meshes --> メッシュ名のリスト.
+# @return (N,6) [xmin, ymin, zmin, xmax, ymax, zmax].
+#---------------------------------------.
+def getWorldBoxes(meshes):
+    return getCache().worldBoxes(meshes)
+
+#---------------------------------------.
+# オブジェクト空間のバウンディングボックスをまとめて取得(キャッシュから).
+# @param[in] meshes --> メッシュ名のリスト.
+# @return (N,2,3) [[最小値], [最大値]].
+#---------------------------------------.
+def getLocalBoxes(meshes):
+    cache = getCache()
+    return np.array([cache.localBox(mesh) for mesh in meshes], dtype=np.float64).reshape(-1, 2, 3)
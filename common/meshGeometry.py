@@ -0,0 +1,555 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import OrderedDict
+import itertools
+import re
+
+import numpy as np
+
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    #Mayaの外(テストやベンチマーク)ではFakeMeshBackendを使う
+    om = None
+
+#メッシュの頂点座標・法線をまとめて配列で取得する層
+#Mayaへの問い合わせはバックエンド(MeshBackend)に任せるので、FakeMeshBackendに差し替えればMayaなしで動かせる
+
+_COMPONENT_PATTERN = re.compile(r'^(.+?)\.(vtx|e|f|map)\[(\d+)(?::(\d+))?\]$')
+
+#dirtyになったら形状が変わったとみなすメッシュのアトリビュート(worldMeshなどトランスフォームで変わるものは含めない)
+GEOMETRY_ATTRIBUTES = frozenset(['inMesh', 'outMesh', 'cachedInMesh', 'pnts', 'pntx', 'pnty', 'pntz'])
+
+#---------------------------------------.
+# 多角形ごとのNewellベクトル(向きが法線、長さが面積の2倍)をまとめて計算.
+# @param[in] points --> 頂点座標(N,3).
+# @param[in] counts --> 各多角形の頂点数(F,). 0の多角形は0ベクトルになる.
+# @param[in] connects --> 全多角形の頂点インデックスを連結したもの(sum(counts),).
+# @return (F,3).
+#---------------------------------------.
+def polygonAreaVectors(points, counts, connects):
+    points = np.asarray(points, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.int64)
+    connects = np.asarray(connects, dtype=np.int64)
+    result = np.zeros((len(counts), 3))
+    valid = counts > 0
+    if not valid.any():
+        return result
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    #各頂点の「多角形内の次の頂点」
+    nexts = np.arange(len(connects)) + 1
+    last = offsets[valid] + counts[valid] - 1
+    nexts[last] = offsets[valid]
+
+    cur = points[connects]
+    nxt = points[connects[nexts]]
+    terms = np.cross(cur, nxt)
+    result[valid] = np.add.reduceat(terms, offsets[valid], axis=0)
+    return result
+
+#---------------------------------------.
+# 多角形の法線をまとめて計算(Newell法. 凹多角形や非平面の多角形でも安定する).
+# @param[in] points --> 頂点座標(N,3).
+# @param[in] counts --> 各多角形の頂点数(F,).
+# @param[in] connects --> 全多角形の頂点インデックスを連結したもの(sum(counts),).
+# @return 単位法線(F,3).
+#---------------------------------------.
+def polygonNormals(points, counts, connects):
+    normals = polygonAreaVectors(points, counts, connects)
+    length = np.linalg.norm(normals, axis=1)[:, np.newaxis]
+    return normals / np.where(length > 0, length, 1.0)
+
+#---------------------------------------.
+# 多角形の面積をまとめて計算. 2次元(UVなど)の座標も使える.
+# @param[in] points --> 頂点座標(N,3)または(N,2).
+# @param[in] counts --> 各多角形の頂点数(F,).
+# @param[in] connects --> 全多角形の頂点インデックスを連結したもの.
+# @return 面積(F,).
+#---------------------------------------.
+def polygonAreas(points, counts, connects):
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape[-1] == 2:
+        points = np.column_stack([points, np.zeros(len(points))])
+    return np.linalg.norm(polygonAreaVectors(points, counts, connects), axis=1) / 2.0
+
+#---------------------------------------.
+# 一部の多角形だけを取り出す.
+# @param[in] counts --> 各多角形の頂点数(F,).
+# @param[in] connects --> 全多角形の頂点インデックスを連結したもの.
+# @param[in] faces --> 取り出す多角形の番号.
+# @return (counts, connects).
+#---------------------------------------.
+def selectPolygons(counts, connects, faces):
+    counts = np.asarray(counts, dtype=np.int64)
+    faces = np.asarray(faces, dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    sub_counts = counts[faces]
+    starts = np.repeat(offsets[faces], sub_counts)
+    local = np.arange(sub_counts.sum()) - np.repeat(np.cumsum(sub_counts) - sub_counts, sub_counts)
+    return (sub_counts, np.asarray(connects, dtype=np.int64)[starts + local])
+
+#---------------------------------------.
+# 多角形を扇形に三角形分割する.
+# @param[in] counts --> 各多角形の頂点数(F,).
+# @param[in] connects --> 全多角形の頂点インデックスを連結したもの.
+# @return 三角形の頂点インデックス(T,3).
+#---------------------------------------.
+def fanTriangles(counts, connects):
+    counts = np.asarray(counts, dtype=np.int64)
+    connects = np.asarray(connects, dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    tri_counts = np.maximum(counts - 2, 0)
+    first = np.repeat(offsets, tri_counts)
+    local = np.arange(tri_counts.sum()) - np.repeat(np.cumsum(tri_counts) - tri_counts, tri_counts)
+    return np.column_stack([connects[first], connects[first + local + 1], connects[first + local + 2]])
+
+#---------------------------------------.
+# 頂点法線を隣接する多角形の法線の平均として計算.
+# @param[in] point_count --> 頂点数.
+# @param[in] counts --> 各多角形の頂点数(F,).
+# @param[in] connects --> 全多角形の頂点インデックスを連結したもの.
+# @param[in] face_normals --> 多角形の法線(F,3).
+# @return 単位法線(N,3).
+#---------------------------------------.
+def averageVertexNormals(point_count, counts, connects, face_normals):
+    normals = np.zeros((point_count, 3))
+    np.add.at(normals, np.asarray(connects, dtype=np.int64), np.repeat(face_normals, counts, axis=0))
+    length = np.linalg.norm(normals, axis=1)[:, np.newaxis]
+    return normals / np.where(length > 0, length, 1.0)
+
+#---------------------------------------.
+# 多角形の辺をまとめて取得.
+# @param[in] counts --> 各多角形の頂点数(F,).
+# @param[in] connects --> 全多角形の頂点インデックスを連結したもの.
+# @return 重複のない辺の頂点インデックス(E,2) (各行は小さい番号が先).
+#---------------------------------------.
+def polygonEdges(counts, connects):
+    counts = np.asarray(counts, dtype=np.int64)
+    connects = np.asarray(connects, dtype=np.int64)
+    if not len(counts):
+        return np.zeros((0, 2), dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    nexts = np.arange(len(connects)) + 1
+    nexts[offsets + counts - 1] = offsets
+    edges = np.sort(np.column_stack([connects, connects[nexts]]), axis=1)
+    return np.unique(edges, axis=0)
+
+#---------------------------------------.
+# 辺でつながっている頂点のまとまり(連結成分)に番号をつける.
+# union-findを配列でまとめて行う. 各辺の両端の根を小さい番号の根につなぎ、親をたどって根に直接つなぎ直すのを繰り返す.
+# @param[in] count --> 頂点数.
+# @param[in] edges --> 辺の頂点インデックス(E,2).
+# @return 各頂点の連結成分の番号(count,). 0からの連番.
+#---------------------------------------.
+def connectedComponents(count, edges):
+    parent = np.arange(count)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    while True:
+        a, b = parent[edges[:, 0]], parent[edges[:, 1]]
+        joined = a != b
+        if not joined.any():
+            break
+        #union
+        np.minimum.at(parent, np.maximum(a, b)[joined], np.minimum(a, b)[joined])
+        #find(経路圧縮)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return np.unique(parent, return_inverse=True)[1].reshape(-1)
+
+#---------------------------------------.
+# インデックスを連続した範囲にまとめる.
+# @param[in] indices --> インデックスの配列.
+# @return 範囲の (先頭, 末尾) (R,2). 末尾も範囲に含む.
+#---------------------------------------.
+def indexRanges(indices):
+    indices = np.unique(np.asarray(indices, dtype=np.int64))
+    if not len(indices):
+        return np.zeros((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    starts = indices[np.concatenate([[0], breaks])]
+    ends = indices[np.concatenate([breaks - 1, [len(indices) - 1]])]
+    return np.column_stack([starts, ends])
+
+#---------------------------------------.
+# インデックスを範囲指定のコンポーネント名にする(parseComponentsの逆).
+# @param[in] node --> ノード名.
+# @param[in] kind --> 'vtx','e','f','map'.
+# @param[in] indices --> インデックスの配列.
+# @return 'pCube1.vtx[0:7]' のようなコンポーネント名のリスト.
+#---------------------------------------.
+def formatComponents(node, kind, indices):
+    return ['{0}.{1}[{2}]'.format(node, kind, start) if start == end else '{0}.{1}[{2}:{3}]'.format(node, kind, start, end)
+            for start, end in indexRanges(indices).tolist()]
+
+#---------------------------------------.
+# コンポーネント名をメッシュごとのインデックス配列にまとめる.
+# 'pCube1.vtx[3]' や 'pCube1.f[0:5]' のような範囲指定にも対応する.
+# @param[in] components --> コンポーネント名のリスト.
+# @return OrderedDict {(ノード名, 種類('vtx','e','f','map')): インデックス配列(重複なし・昇順)}.
+#---------------------------------------.
+def parseComponents(components):
+    groups = OrderedDict()
+    for component in components or []:
+        match = _COMPONENT_PATTERN.match(component)
+        if not match:
+            continue
+        node, kind, start, end = match.groups()
+        start = int(start)
+        end = int(end) if end is not None else start
+        groups.setdefault((node, kind), []).append(np.arange(start, end + 1))
+    return OrderedDict((key, np.unique(np.concatenate(value))) for key, value in groups.items())
+
+#---------------------------------------.
+# メッシュへの問い合わせのインターフェース.
+# 各メソッドは1回の問い合わせでメッシュ全体の値を連続した配列で返す.
+#---------------------------------------.
+class MeshBackend(object):
+    #頂点座標(N,3)
+    def points(self, mesh, worldSpace=True):
+        raise NotImplementedError
+    #多角形の構成 (各多角形の頂点数(F,), 頂点インデックスを連結したもの)
+    def polygons(self, mesh):
+        raise NotImplementedError
+    #頂点法線(N,3)
+    def vertexNormals(self, mesh, worldSpace=True):
+        raise NotImplementedError
+    #三角形分割の頂点インデックス(T,3)
+    def triangles(self, mesh):
+        raise NotImplementedError
+    #UV (UV座標(M,2), 各多角形のUV数(F,), UVインデックスを連結したもの). uvSetがNoneの場合は現在のUVセット
+    def uvs(self, mesh, uvSet=None):
+        raise NotImplementedError
+    #ワールド行列(4,4) (Mayaの行ベクトル形式)
+    def worldMatrix(self, mesh):
+        raise NotImplementedError
+    #メッシュ(形状またはワールド行列)が変更されるたびに変わる値. Noneの場合は変更を追跡できない
+    def version(self, mesh):
+        return None
+    #形状(頂点座標や構成)が変更されるたびに変わる値. トランスフォームの変更では変わらない. Noneの場合は変更を追跡できない
+    def geometryVersion(self, mesh):
+        return None
+    #オブジェクト空間のバウンディングボックス (最小値(3,), 最大値(3,))
+    def localBoundingBox(self, mesh):
+        points = self.points(mesh, worldSpace=False)
+        return (points.min(axis=0), points.max(axis=0))
+    #頂点座標(N,3)をまとめて設定 (undoできない. プレビュー用)
+    def setPoints(self, mesh, points, worldSpace=True):
+        raise NotImplementedError
+
+#---------------------------------------.
+# Maya(OpenMaya API 2.0)のバックエンド.
+#---------------------------------------.
+class MayaMeshBackend(MeshBackend):
+    def __init__(self):
+        #メッシュ名 --> 変更番号. シェイプとトランスフォームがdirtyになるたびにコールバックで新しい番号にする
+        #番号は全メッシュで通しなので、削除して同じ名前で作り直したメッシュが古い番号と一致することはない
+        self._versions = {}
+        #メッシュ名 --> 形状の変更番号. シェイプの形状のアトリビュートがdirtyになったときだけ新しい番号にする
+        self._geometryVersions = {}
+        self._counter = itertools.count(1)
+        self._callbacks = []
+
+    def _fn(self, mesh):
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        dag = selection.getDagPath(0)
+        dag.extendToShape()
+        return om.MFnMesh(dag)
+
+    def _space(self, worldSpace):
+        return om.MSpace.kWorld if worldSpace else om.MSpace.kObject
+
+    def points(self, mesh, worldSpace=True):
+        return np.array(self._fn(mesh).getPoints(self._space(worldSpace)), dtype=np.float64)[:, :3].reshape(-1, 3)
+
+    def setPoints(self, mesh, points, worldSpace=True):
+        self._fn(mesh).setPoints(om.MPointArray(np.asarray(points, dtype=np.float64).tolist()), self._space(worldSpace))
+
+    def polygons(self, mesh):
+        counts, connects = self._fn(mesh).getVertices()
+        return (np.array(counts, dtype=np.int64), np.array(connects, dtype=np.int64))
+
+    def vertexNormals(self, mesh, worldSpace=True):
+        return np.array(self._fn(mesh).getVertexNormals(False, self._space(worldSpace)), dtype=np.float64).reshape(-1, 3)
+
+    def triangles(self, mesh):
+        counts, vertices = self._fn(mesh).getTriangles()
+        return np.array(vertices, dtype=np.int64).reshape(-1, 3)
+
+    def uvs(self, mesh, uvSet=None):
+        fn = self._fn(mesh)
+        us, vs = fn.getUVs(uvSet or '')
+        counts, ids = fn.getAssignedUVs(uvSet or '')
+        return (np.column_stack([np.array(us, dtype=np.float64), np.array(vs, dtype=np.float64)]).reshape(-1, 2),
+                np.array(counts, dtype=np.int64), np.array(ids, dtype=np.int64))
+
+    def localBoundingBox(self, mesh):
+        box = self._fn(mesh).boundingBox
+        return (np.array(box.min, dtype=np.float64)[:3], np.array(box.max, dtype=np.float64)[:3])
+
+    def worldMatrix(self, mesh):
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        return np.array(selection.getDagPath(0).inclusiveMatrix(), dtype=np.float64).reshape(4, 4)
+
+    def version(self, mesh):
+        if mesh not in self._versions:
+            self._versions[mesh] = next(self._counter)
+            self._geometryVersions[mesh] = next(self._counter)
+            selection = om.MSelectionList()
+            selection.add(mesh)
+            dag = selection.getDagPath(0)
+            nodes = [dag.node()]
+            if dag.node().hasFn(om.MFn.kTransform):
+                dag.extendToShape()
+                nodes.append(dag.node())
+
+            def onDirty(*args):
+                if mesh in self._versions:
+                    self._versions[mesh] = next(self._counter)
+
+            def onGeometryDirty(node, plug, *args):
+                if mesh in self._geometryVersions and om.MFnAttribute(plug.attribute()).name in GEOMETRY_ATTRIBUTES:
+                    self._geometryVersions[mesh] = next(self._counter)
+
+            def onRemove(*args):
+                #次に問い合わせたときにコールバックを登録し直す
+                self._versions.pop(mesh, None)
+                self._geometryVersions.pop(mesh, None)
+
+            for node in nodes:
+                self._callbacks.append(om.MNodeMessage.addNodeDirtyCallback(node, onDirty))
+                self._callbacks.append(om.MNodeMessage.addNodePreRemovalCallback(node, onRemove))
+            self._callbacks.append(om.MNodeMessage.addNodeDirtyPlugCallback(nodes[-1], onGeometryDirty))
+        return self._versions[mesh]
+
+    def geometryVersion(self, mesh):
+        self.version(mesh)
+        return self._geometryVersions.get(mesh)
+
+    #---------------------------------------.
+    # 変更を追跡するコールバックをすべて削除する.
+    #---------------------------------------.
+    def removeCallbacks(self):
+        if self._callbacks:
+            om.MMessage.removeCallbacks(self._callbacks)
+        self._callbacks = []
+        self._versions.clear()
+        self._geometryVersions.clear()
+
+#---------------------------------------.
+# Mayaを使わないメッシュ(テスト・ベンチマーク用).
+# @param[in] points --> オブジェクト空間の頂点座標(N,3).
+# @param[in] faces --> 多角形ごとの頂点インデックスのリスト.
+# @param[in] matrix --> ワールド行列(4,4) (Mayaの行ベクトル形式). Noneの場合は単位行列.
+# @param[in] uvs --> 頂点ごとのUV座標(N,2). Noneの場合はUVなし.
+# 頂点座標や行列を書き換えた場合は touch() で変更番号を増やす(行列だけの場合は touch(geometry=False)).
+#---------------------------------------.
+class FakeMesh(object):
+    def __init__(self, points, faces, matrix=None, uvs=None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.counts = np.array([len(face) for face in faces], dtype=np.int64)
+        self.connects = np.array([i for face in faces for i in face], dtype=np.int64)
+        self.matrix = np.eye(4) if matrix is None else np.asarray(matrix, dtype=np.float64)
+        self.uvs = None if uvs is None else np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+        self.version = 0
+        self.geometryVersion = 0
+
+    def touch(self, geometry=True):
+        self.version += 1
+        if geometry:
+            self.geometryVersion += 1
+
+#---------------------------------------.
+# FakeMeshを名前で引くバックエンド.
+# @param[in] meshes --> {メッシュ名: FakeMesh}.
+#---------------------------------------.
+class FakeMeshBackend(MeshBackend):
+    def __init__(self, meshes=None):
+        self.meshes = dict(meshes or {})
+        #問い合わせ回数(ベンチマーク用)
+        self.calls = 0
+
+    def _mesh(self, mesh):
+        self.calls += 1
+        return self.meshes[mesh]
+
+    def points(self, mesh, worldSpace=True):
+        fake = self._mesh(mesh)
+        if not worldSpace:
+            return fake.points.copy()
+        return fake.points.dot(fake.matrix[:3, :3]) + fake.matrix[3, :3]
+
+    def setPoints(self, mesh, points, worldSpace=True):
+        fake = self._mesh(mesh)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if worldSpace:
+            inverse = np.linalg.inv(fake.matrix)
+            points = points.dot(inverse[:3, :3]) + inverse[3, :3]
+        fake.points = points
+        fake.touch()
+
+    def polygons(self, mesh):
+        fake = self._mesh(mesh)
+        return (fake.counts.copy(), fake.connects.copy())
+
+    def vertexNormals(self, mesh, worldSpace=True):
+        fake = self._mesh(mesh)
+        points = self.points(mesh, worldSpace)
+        return averageVertexNormals(len(points), fake.counts, fake.connects,
+                                    polygonNormals(points, fake.counts, fake.connects))
+
+    def triangles(self, mesh):
+        fake = self._mesh(mesh)
+        return fanTriangles(fake.counts, fake.connects)
+
+    def uvs(self, mesh, uvSet=None):
+        fake = self._mesh(mesh)
+        if fake.uvs is None:
+            return (np.zeros((0, 2)), np.zeros(len(fake.counts), dtype=np.int64), np.zeros(0, dtype=np.int64))
+        return (fake.uvs.copy(), fake.counts.copy(), fake.connects.copy())
+
+    def worldMatrix(self, mesh):
+        return self._mesh(mesh).matrix.copy()
+
+    def version(self, mesh):
+        return self.meshes[mesh].version
+
+    def geometryVersion(self, mesh):
+        return self.meshes[mesh].geometryVersion
+
+    def localBoundingBox(self, mesh):
+        points = self._mesh(mesh).points
+        return (points.min(axis=0), points.max(axis=0))
+
+_backend = [MayaMeshBackend() if om is not None else None]
+
+#---------------------------------------.
+# 使用するバックエンドを取得/設定.
+#---------------------------------------.
+def getBackend():
+    return _backend[0]
+def setBackend(backend):
+    _backend[0] = backend
+
+#---------------------------------------.
+# 頂点座標をまとめて取得.
+# @param[in] mesh --> メッシュ(トランスフォームまたはシェイプ)名.
+# @param[in] vertices --> 取り出す頂点番号(Noneの場合はすべて).
+# @param[in] worldSpace --> Trueの場合はワールド座標.
+# @return 座標(N,3).
+#---------------------------------------.
+def getPoints(mesh, vertices=None, worldSpace=True):
+    points = getBackend().points(mesh, worldSpace)
+    return points if vertices is None else points[np.asarray(vertices, dtype=np.int64)]
+
+#---------------------------------------.
+# 頂点座標をまとめて設定. undoには記録されないので、プレビューなど後で元に戻す場合に使う.
+# @param[in] mesh --> メッシュ名.
+# @param[in] points --> 全頂点の座標(N,3).
+# @param[in] worldSpace --> Trueの場合はワールド座標.
+#---------------------------------------.
+def setPoints(mesh, points, worldSpace=True):
+    getBackend().setPoints(mesh, points, worldSpace)
+
+#---------------------------------------.
+# フェースの法線をまとめて取得.
+# @param[in] mesh --> メッシュ名.
+# @param[in] faces --> 取り出すフェース番号(Noneの場合はすべて).
+# @param[in] worldSpace --> Trueの場合はワールド空間の法線.
+# @return 単位法線(F,3).
+#---------------------------------------.
+def getFaceNormals(mesh, faces=None, worldSpace=True):
+    backend = getBackend()
+    points = backend.points(mesh, worldSpace)
+    counts, connects = backend.polygons(mesh)
+    if faces is not None:
+        counts, connects = selectPolygons(counts, connects, faces)
+    return polygonNormals(points, counts, connects)
+
+#---------------------------------------.
+# 頂点法線をまとめて取得.
+# @param[in] mesh --> メッシュ名.
+# @param[in] vertices --> 取り出す頂点番号(Noneの場合はすべて).
+# @param[in] worldSpace --> Trueの場合はワールド空間の法線.
+# @return 単位法線(N,3).
+#---------------------------------------.
+def getVertexNormals(mesh, vertices=None, worldSpace=True):
+    normals = getBackend().vertexNormals(mesh, worldSpace)
+    return normals if vertices is None else normals[np.asarray(vertices, dtype=np.int64)]
+
+#---------------------------------------.
+# 多角形の構成を取得.
+# @param[in] mesh --> メッシュ名.
+# @return (各多角形の頂点数(F,), 頂点インデックスを連結したもの).
+#---------------------------------------.
+def getPolygons(mesh):
+    return getBackend().polygons(mesh)
+
+#---------------------------------------.
+# 多角形の辺をまとめて取得.
+# @param[in] mesh --> メッシュ名.
+# @param[in] faces --> 辺を取り出すフェース番号(Noneの場合はすべて).
+# @return 重複のない辺の頂点インデックス(E,2).
+#---------------------------------------.
+def getEdges(mesh, faces=None):
+    counts, connects = getBackend().polygons(mesh)
+    if faces is not None:
+        counts, connects = selectPolygons(counts, connects, faces)
+    return polygonEdges(counts, connects)
+
+#---------------------------------------.
+# UVをまとめて取得.
+# @param[in] mesh --> メッシュ名.
+# @param[in] uvSet --> UVセット名(Noneの場合は現在のUVセット).
+# @return (UV座標(M,2), 各多角形のUV数(F,) UVがない多角形は0, UVインデックスを連結したもの).
+#---------------------------------------.
+def getUVs(mesh, uvSet=None):
+    return getBackend().uvs(mesh, uvSet)
+
+#---------------------------------------.
+# 三角形分割の頂点インデックスを取得.
+# @param[in] mesh --> メッシュ名.
+# @return (T,3).
+#---------------------------------------.
+def getTriangles(mesh):
+    return getBackend().triangles(mesh)
+
+#---------------------------------------.
+# ワールド行列を取得.
+# @param[in] mesh --> メッシュ名.
+# @return (4,4).
+#---------------------------------------.
+def getWorldMatrix(mesh):
+    return getBackend().worldMatrix(mesh)
+
+#---------------------------------------.
+# 変更を判定するための値を取得.
+# @param[in] mesh --> メッシュ名.
+# @return メッシュが変更されるたびに変わる値(追跡できない場合はNone).
+#---------------------------------------.
+def getVersion(mesh):
+    return getBackend().version(mesh)
+
+#---------------------------------------.
+# 形状の変更を判定するための値を取得(トランスフォームの変更では変わらない).
+# @param[in] mesh --> メッシュ名.
+# @return 形状が変更されるたびに変わる値(追跡できない場合はNone).
+#---------------------------------------.
+def getGeometryVersion(mesh):
+    return getBackend().geometryVersion(mesh)
+
+#---------------------------------------.
+# オブジェクト空間のバウンディングボックスを取得(頂点は読まない).
+# @param[in] mesh --> メッシュ名.
+# @return (最小値(3,), 最大値(3,)).
+#---------------------------------------.
+def getLocalBoundingBox(mesh):
+    return getBackend().localBoundingBox(mesh)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+"""meshGeometry(一括取得)と1フェースずつの計算との速度比較. Mayaなしで実行できます.
+
+python -m common.meshGeometry_benchmark
+"""
+
+import timeit
+
+import numpy as np
+
+from . import meshGeometry as mg
+
+#---------------------------------------.
+# グリッド状のFakeMeshを作成.
+# @param[in] size --> 1辺のフェース数.
+# @return FakeMesh.
+#---------------------------------------.
+def gridMesh(size):
+    x, z = np.meshgrid(np.arange(size + 1, dtype=np.float64), np.arange(size + 1, dtype=np.float64))
+    y = np.sin(x * 0.3) * np.cos(z * 0.2)
+    points = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+    index = np.arange((size + 1) * (size + 1)).reshape(size + 1, size + 1)
+    faces = np.column_stack([index[:-1, :-1].ravel(), index[1:, :-1].ravel(),
+                             index[1:, 1:].ravel(), index[:-1, 1:].ravel()])
+    return mg.FakeMesh(points, faces.tolist())
+
+#従来の方法に相当する、1フェースずつ問い合わせて法線を計算する実装
+def _perFaceNormals(backend, mesh):
+    counts, connects = backend.polygons(mesh)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).tolist()
+    normals = []
+    for offset, count in zip(offsets, counts.tolist()):
+        face = connects[offset:offset + count].tolist()
+        pts = [backend.points(mesh)[i].tolist() for i in face]
+        n = [0.0, 0.0, 0.0]
+        for i in range(count):
+            a, b = pts[i], pts[(i + 1) % count]
+            n[0] += a[1]*b[2] - a[2]*b[1]
+            n[1] += a[2]*b[0] - a[0]*b[2]
+            n[2] += a[0]*b[1] - a[1]*b[0]
+        length = sum(v*v for v in n) ** 0.5
+        normals.append([v / length for v in n])
+    return normals
+
+#---------------------------------------.
+# ベンチマークを実行して結果を表示.
+# @param[in] size --> グリッドの1辺のフェース数.
+# @param[in] repeat --> 計測回数(最速の値を採用).
+# @return (1フェースずつの秒数, 一括取得の秒数).
+#---------------------------------------.
+def main(size=100, repeat=3):
+    backend = mg.FakeMeshBackend({'grid': gridMesh(size)})
+    previous = mg.getBackend()
+    mg.setBackend(backend)
+    try:
+        backend.calls = 0
+        per_face = min(timeit.repeat(lambda: _perFaceNormals(backend, 'grid'), number=1, repeat=repeat))
+        per_face_calls = backend.calls // repeat
+
+        backend.calls = 0
+        bulk = min(timeit.repeat(lambda: mg.getFaceNormals('grid'), number=1, repeat=repeat))
+        bulk_calls = backend.calls // repeat
+
+        diff = np.abs(np.array(_perFaceNormals(backend, 'grid')) - mg.getFaceNormals('grid')).max()
+    finally:
+        mg.setBackend(previous)
+
+    print("faces      : {0}".format(size * size))
+    print("per-face   : {0:.4f} sec ({1} queries)".format(per_face, per_face_calls))
+    print("bulk       : {0:.4f} sec ({1} queries, {2:.1f}x)".format(bulk, bulk_calls, per_face / bulk))
+    print("max diff   : {0:.3e}".format(diff))
+    return (per_face, bulk)
+
+if __name__ == "__main__":
+    main()
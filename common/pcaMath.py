@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+#頂点群の主成分分析(重心・共分散・平面・主軸)と回転行列からの角度の計算
+#setGround(平面の当てはめ)と relativeScaleByPivot(回転したバウンディングボックス)で共有する
+#複数の頂点群は座標を連結した(N,3)と頂点数(T,)でまとめて渡す
+
+EPSILON = 1e-5
+
+#---------------------------------------.
+# 頂点群ごとの重心と共分散行列をまとめて計算.
+# @param[in] points --> 全頂点群の座標を連結したもの(N,3).
+# @param[in] counts --> 各頂点群の頂点数(T,). Noneの場合は全体を1つの頂点群とする.
+# @return (重心(T,3), 共分散行列(T,3,3)). 共分散は頂点数で割らない.
+#---------------------------------------.
+def covarianceMatrices(points, counts=None):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if counts is None:
+        counts = [len(points)]
+    counts = np.asarray(counts, dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    centroids = np.add.reduceat(points, offsets, axis=0) / counts[:, np.newaxis]
+    centered = points - np.repeat(centroids, counts, axis=0)
+
+    #共分散行列は6成分(対称)だけを積算して(N,6)の一時配列に抑える
+    i, j = np.triu_indices(3)
+    cov_flat = np.add.reduceat(centered[:, i] * centered[:, j], offsets, axis=0)
+    cov = np.zeros((len(counts), 3, 3))
+    cov[:, i, j] = cov_flat
+    cov[:, j, i] = cov_flat
+    return (centroids, cov)
+
+#---------------------------------------.
+# 頂点群に最小二乗で平面を当てはめる(複数の頂点群をまとめて計算).
+# 頂点群ごとの共分散行列(3x3)の最小固有値の固有ベクトルを法線とする.
+# @param[in] points --> 全頂点群の座標を連結したもの(N,3).
+# @param[in] counts --> 各頂点群の頂点数(T,). Noneの場合は全体を1つの頂点群とする.
+# @return (重心(T,3), 単位法線(T,3)). 法線の向きは不定なので orientNormals で揃える.
+#---------------------------------------.
+def fitPlanes(points, counts=None):
+    centroids, cov = covarianceMatrices(points, counts)
+
+    #eighは固有値の昇順で返すので先頭の固有ベクトルが法線
+    normals = np.linalg.eigh(cov)[1][..., 0]
+    return (centroids, normals)
+
+#---------------------------------------.
+# 頂点群ごとの主軸(主成分分析)をまとめて計算.
+# @param[in] points --> 全頂点群の座標を連結したもの(N,3).
+# @param[in] counts --> 各頂点群の頂点数(T,). Noneの場合は全体を1つの頂点群とする.
+# @return (重心(T,3), 主軸(T,3,3)). 主軸は行が軸で分散の大きい順. 右手系の回転行列(Mayaの行ベクトル形式)になる.
+#---------------------------------------.
+def principalAxes(points, counts=None):
+    centroids, cov = covarianceMatrices(points, counts)
+    vectors = np.linalg.eigh(cov)[1]
+    axes = np.swapaxes(vectors[..., ::-1], -1, -2).copy()
+    axes[..., 2, :] = np.cross(axes[..., 0, :], axes[..., 1, :])
+    return (centroids, axes)
+
+#---------------------------------------.
+# 回転行列(Mayaの行ベクトル形式. 回転順序xyz)からxyzの回転角度(ラジアン)を求める.
+# @param[in] mat --> 回転行列(...,3,3)または(...,4,4).
+# @return (x, y, z) それぞれ(...).
+#---------------------------------------.
+def getXYZFromRotateMatrix(mat):
+    mat = np.asarray(mat, dtype=np.float64)
+    y = np.arcsin(np.clip(-mat[..., 0, 2], -1.0, 1.0))
+    x = np.arctan2(mat[..., 1, 2], mat[..., 2, 2])
+    z = np.arctan2(mat[..., 0, 1], mat[..., 0, 0])
+
+    #y = ±90度(ジンバルロック)の場合はxを0としてzにまとめる
+    lock = np.abs(mat[..., 0, 2]) > 1.0 - EPSILON
+    x = np.where(lock, 0.0, x)
+    z = np.where(lock, np.arctan2(-mat[..., 1, 0], mat[..., 1, 1]), z)
+    return (x, y, z)
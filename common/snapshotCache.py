@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+try:
+    from maya import cmds
+except ImportError:
+    cmds = None
+
+from . import boundsCache, meshGeometry
+
+#メッシュごとのワールド頂点座標・バウンディングボックス・ワールド行列のキャッシュ
+#メッシュの変更番号(meshGeometry.getVersion)が変わった場合だけ取得し直す
+#変更を追跡できない場合(バージョンがNone)は毎回取得し直す
+
+#キャッシュに保持する配列の合計サイズの上限(バイト)
+MEMORY_BUDGET = 256 * 1024 * 1024
+
+#points --> ワールド空間の頂点座標(N,3). 読み取り専用
+#boundingBox --> (最小値(3,), 最大値(3,)). 頂点がない場合はNone
+#worldMatrix --> ワールド行列(4,4)
+#version --> 取得したときのメッシュの変更番号
+Snapshot = namedtuple('Snapshot', ['points', 'boundingBox', 'worldMatrix', 'version'])
+
+#---------------------------------------.
+# 最近使っていないものから捨てる(LRU)スナップショットのキャッシュ.
+# @param[in] budget --> 保持する配列の合計サイズの上限(バイト).
+#---------------------------------------.
+class SnapshotCache(object):
+    def __init__(self, budget=MEMORY_BUDGET):
+        self.budget = budget
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, mesh):
+        return mesh in self._entries
+
+    #---------------------------------------.
+    # スナップショットを取得. 変更されていなければキャッシュを返す.
+    # @param[in] mesh --> メッシュ名.
+    # @return Snapshot.
+    #---------------------------------------.
+    def get(self, mesh):
+        version = meshGeometry.getVersion(mesh)
+        entry = self._entries.get(mesh)
+        if entry is not None and version is not None and entry.version == version:
+            #最近使ったものとして末尾へ移す
+            del self._entries[mesh]
+            self._entries[mesh] = entry
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        self.invalidate(mesh)
+        points = meshGeometry.getPoints(mesh)
+        points.setflags(write=False)
+        box = (points.min(axis=0), points.max(axis=0)) if len(points) else None
+        entry = Snapshot(points, box, meshGeometry.getWorldMatrix(mesh), version)
+        if version is None:
+            return entry
+
+        self._entries[mesh] = entry
+        self.nbytes += points.nbytes
+        self._evict()
+        return entry
+
+    #---------------------------------------.
+    # 上限を超えている間、最近使っていないものから捨てる(最新の1件は残す).
+    #---------------------------------------.
+    def _evict(self):
+        while self.nbytes > self.budget and len(self._entries) > 1:
+            mesh, entry = self._entries.popitem(last=False)
+            self.nbytes -= entry.points.nbytes
+            self.evictions += 1
+
+    #---------------------------------------.
+    # キャッシュを捨てる.
+    # @param[in] mesh --> メッシュ名. Noneの場合はすべて.
+    #---------------------------------------.
+    def invalidate(self, mesh=None):
+        if mesh is None:
+            self._entries.clear()
+            self.nbytes = 0
+            return
+        entry = self._entries.pop(mesh, None)
+        if entry is not None:
+            self.nbytes -= entry.points.nbytes
+
+    #---------------------------------------.
+    # 統計情報.
+    # @return {'entries', 'nbytes', 'hits', 'misses', 'evictions'}.
+    #---------------------------------------.
+    def stats(self):
+        return {'entries': len(self._entries), 'nbytes': self.nbytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def resetStats(self):
+        self.hits = self.misses = self.evictions = 0
+
+_cache = [SnapshotCache()]
+
+#---------------------------------------.
+# 共有のキャッシュを取得.
+# @return SnapshotCache.
+#---------------------------------------.
+def getCache():
+    return _cache[0]
+
+#---------------------------------------.
+# 共有のキャッシュを差し替える.
+# @param[in] cache --> SnapshotCache.
+#---------------------------------------.
+def setCache(cache):
+    _cache[0] = cache
+
+#---------------------------------------.
+# スナップショットを取得.
+# @param[in] mesh --> メッシュ名.
+# @return Snapshot.
+#---------------------------------------.
+def getSnapshot(mesh):
+    return getCache().get(mesh)
+
+#---------------------------------------.
+# ワールド空間の頂点座標を取得.
+# @param[in] mesh --> メッシュ名.
+# @return 読み取り専用の頂点座標(N,3).
+#---------------------------------------.
+def getWorldPoints(mesh):
+    return getCache().get(mesh).points
+
+#---------------------------------------.
+# ワールド空間のバウンディングボックスを取得.
+# @param[in] mesh --> メッシュ名.
+# @return exactWorldBoundingBoxと同じ並びの [xmin, ymin, zmin, xmax, ymax, zmax].
+#---------------------------------------.
+def getWorldBoundingBox(mesh):
+    box = getCache().get(mesh).boundingBox
+    if box is None:
+        return [0.0] * 6
+    return np.concatenate(box).tolist()
+
+#---------------------------------------.
+# ノードをメッシュとして扱うもの(メッシュ または メッシュだけを子に持つトランスフォーム)とそれ以外に分ける.
+# @param[in] nodes --> ノード名のリスト.
+# @return (フルパスのリスト, メッシュとして扱うか(N,)).
+#---------------------------------------.
+def _classifyNodes(nodes):
+    #フルパスでない名前だけフルパスに直す(子の親をパスで判定するため)
+    nodes = [node if node.startswith('|') else cmds.ls(node, long=True)[0] for node in nodes]
+    mesh_nodes = set(cmds.ls(nodes, type='mesh', long=True) or [])
+
+    #子の数・メッシュの数・中間オブジェクトでないメッシュの数を親ごとに数える
+    children = cmds.listRelatives(nodes, children=True, fullPath=True) or []
+    shapes = set(cmds.ls(children, type='mesh', long=True) or [])
+    meshes = set(cmds.ls(list(shapes), noIntermediate=True, long=True) or [])
+    counts = {}
+    for child in children:
+        count = counts.setdefault(child.rpartition('|')[0], [0, 0, 0])
+        count[0] += 1
+        count[1] += child in shapes
+        count[2] += child in meshes
+
+    mask = np.zeros(len(nodes), dtype=bool)
+    for i, node in enumerate(nodes):
+        count = counts.get(node, (0, 0, 0))
+        mask[i] = node in mesh_nodes or (count[2] == 1 and count[1] == count[0])
+    return (nodes, mask)
+
+#---------------------------------------.
+# ノードがメッシュとして扱われるか(キャッシュやboundsCacheの箱を使えるか)をまとめて判定.
+# @param[in] nodes --> ノード名のリスト.
+# @return bool配列(N,). グループなどはFalse.
+#---------------------------------------.
+def getMeshNodeMask(nodes):
+    if cmds is None:
+        return np.ones(len(nodes), dtype=bool)
+    return _classifyNodes(nodes)[1]
+
+#---------------------------------------.
+# 複数のノードのワールド空間のバウンディングボックスをまとめて取得.
+# メッシュだけを子に持つトランスフォーム(またはメッシュ)はキャッシュを使い、
+# グループなどそれ以外のノードはexactWorldBoundingBoxで取得する. 判定はノードごとではなく全体で数回の問い合わせで行う.
+# exact=Falseの場合、メッシュはキャッシュしたオブジェクト空間の箱をワールド行列で変換して求める(boundsCache).
+# @param[in] nodes --> ノード名のリスト.
+# @param[in] exact --> Falseの場合は頂点を読まずに計算する(回転している場合は大きめの箱になる).
+# @return (N,6) [xmin, ymin, zmin, xmax, ymax, zmax]. nodesと同じ順番.
+#---------------------------------------.
+def getNodeBoundingBoxes(nodes, exact=True):
+    if cmds is None:
+        if not exact:
+            return boundsCache.getWorldBoxes(list(nodes))
+        return np.array([getWorldBoundingBox(node) for node in nodes], dtype=np.float64).reshape(-1, 6)
+    nodes, mesh_mask = _classifyNodes(nodes)
+
+    boxes = np.empty((len(nodes), 6))
+    analytic = []
+    for i, node in enumerate(nodes):
+        if mesh_mask[i]:
+            if exact:
+                boxes[i] = getWorldBoundingBox(node)
+            else:
+                analytic.append(i)
+        else:
+            boxes[i] = cmds.exactWorldBoundingBox(node)
+    if analytic:
+        boxes[analytic] = boundsCache.getWorldBoxes([nodes[i] for i in analytic])
+    return boxes
+
+#---------------------------------------.
+# キャッシュを捨てる.
+# @param[in] mesh --> メッシュ名. Noneの場合はすべて.
+#---------------------------------------.
+def invalidate(mesh=None):
+    getCache().invalidate(mesh)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import timeit
+
+from maya import cmds
+import numpy as np
+
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+from ..common import boundsCache
+from ..common.snapshotCache import getNodeBoundingBoxes, getMeshNodeMask
+
+#objectRelativeScale_ui.py から使う、選択したオブジェクトをまとめてリサイズする処理
+#スケール値とバウンディングボックスは配列でまとめて読み、計算もNumPyで行う
+
+#軸の名前 --> 番号
+AXES = {'x': 0, 'y': 1, 'z': 2}
+#箱に合わせるモード
+#fit --> 比率を保って箱の中に収める, fill --> 比率を保って箱を埋める, stretch --> 各軸を箱の大きさにする
+BOX_MODES = ('fit', 'fill', 'stretch')
+#これ以下の長さは0(平面の厚みなど)として扱う
+EPSILON = 1.0e-8
+#スケールをフリーズするときに1回のmakeIdentityで処理するオブジェクトの数
+FREEZE_CHUNK = 500
+#スケール値と1との差がこれ以下ならフリーズ済みとみなす
+IDENTITY_TOLERANCE = 1.0e-6
+
+#---------------------------------------.
+# オブジェクトのスケール値をまとめて取得.
+# @param[in] objs --> オブジェクト名のリスト.
+# @return (N,3).
+#---------------------------------------.
+def getScales(objs):
+    if om is None:
+        return np.array([cmds.getAttr(obj + '.scale')[0] for obj in objs], dtype=np.float64).reshape(-1, 3)
+    selection = om.MSelectionList()
+    for obj in objs:
+        selection.add(obj)
+    return np.array([om.MFnTransform(selection.getDagPath(i)).scale() for i in range(len(objs))],
+                    dtype=np.float64).reshape(-1, 3)
+
+#---------------------------------------.
+# スケール値をまとめて設定(オブジェクトごとに .scale を1回だけ設定する).
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] scales --> (N,3).
+#---------------------------------------.
+def setScales(objs, scales):
+    cmds.undoInfo(openChunk=True)#ヒストリをまとめる(open)
+    try:
+        for obj, (x, y, z) in zip(objs, np.asarray(scales, dtype=np.float64).tolist()):
+            cmds.setAttr(obj + '.scale', x, y, z, type='double3')
+    finally:
+        cmds.undoInfo(closeChunk=True)#ヒストリをまとめる(close)
+
+#---------------------------------------.
+# バウンディングボックスの各軸の長さ.
+# @param[in] boxes --> (N,6) [xmin, ymin, zmin, xmax, ymax, zmax].
+# @return (N,3).
+#---------------------------------------.
+def boxLengths(boxes):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+    return np.abs(boxes[:, 3:] - boxes[:, :3])
+
+#---------------------------------------.
+# ワールド行列の回転がないか(ローカル軸とワールド軸が同じ向きか).
+# @param[in] matrix --> ワールド行列(16,)または(4,4).
+# @return bool.
+#---------------------------------------.
+def isAxisAligned(matrix):
+    rotation = np.asarray(matrix, dtype=np.float64).reshape(4, 4)[:3, :3]
+    lengths = np.sqrt((rotation * rotation).sum(axis=1))
+    if (lengths <= EPSILON).any():
+        return False
+    return bool((np.abs(rotation / lengths[:, np.newaxis] - np.eye(3)) <= IDENTITY_TOLERANCE).all())
+
+#---------------------------------------.
+# ローカル軸ごとの長さ(オブジェクト空間の箱 x 現在のスケール値)をまとめて取得.
+# 回転していても各軸の長さがその軸のスケール値に対応するので、stretchで使う.
+# メッシュ以外(グループなど)はワールド空間の箱の長さを使うので、回転していないものだけ計算できる.
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] scales --> 現在のスケール値(N,3).
+# @return (長さ(N,3), 計算できたか(N,)).
+#---------------------------------------.
+def getLocalLengths(objs, scales):
+    scales = np.asarray(scales, dtype=np.float64).reshape(-1, 3)
+    lengths = np.zeros((len(objs), 3))
+    valid = np.ones(len(objs), dtype=bool)
+    meshes = getMeshNodeMask(objs)
+
+    indices = np.flatnonzero(meshes).tolist()
+    if indices:
+        boxes = boundsCache.getLocalBoxes([objs[i] for i in indices])
+        lengths[indices] = (boxes[:, 1] - boxes[:, 0]) * np.abs(scales[indices])
+
+    indices = np.flatnonzero(~meshes).tolist()
+    if indices:
+        lengths[indices] = boxLengths(getNodeBoundingBoxes([objs[i] for i in indices]))
+        valid[indices] = [isAxisAligned(cmds.xform(objs[i], query=True, matrix=True, worldSpace=True)) for i in indices]
+    return (lengths, valid)
+
+#---------------------------------------.
+# 指定の軸の長さを指定の値にするスケール値を計算.
+# @param[in] scales --> 現在のスケール値(N,3).
+# @param[in] lengths --> 現在の長さ(N,3).
+# @param[in] axis --> 'x' or 'y' or 'z'.
+# @param[in] length --> 指定の長さ.
+# @return (新しいスケール値(N,3), 計算できたか(N,)). 指定の軸の長さが0のものは元のスケール値のまま.
+#---------------------------------------.
+def calcAxisScales(scales, lengths, axis, length):
+    scales = np.asarray(scales, dtype=np.float64)
+    base = np.asarray(lengths, dtype=np.float64)[:, AXES[axis]]
+    valid = base > EPSILON
+    ratio = np.ones(len(base))
+    ratio[valid] = length / base[valid]
+    return (scales * ratio[:, np.newaxis], valid)
+
+#---------------------------------------.
+# 箱(幅x高さx奥行き)に合わせるスケール値を計算.
+# 長さが0の軸(平面の厚みなど)と、箱の大きさを0以下にした軸は使わない.
+# fit/fillではそれ以外の軸から倍率を決めて全軸に掛け(長さ0の軸は0のまま)、stretchではその軸のスケール値を変えない.
+# stretchは各軸のスケール値に軸ごとの倍率を掛けるので、lengthsはローカル軸の長さ(getLocalLengths)を渡す.
+# @param[in] scales --> 現在のスケール値(N,3).
+# @param[in] lengths --> 現在の長さ(N,3).
+# @param[in] size --> 箱の大きさ(3,).
+# @param[in] mode --> 'fit' or 'fill' or 'stretch'.
+# @return (新しいスケール値(N,3), 計算できたか(N,)). 使える軸がないものは元のスケール値のまま.
+#---------------------------------------.
+def calcBoxScales(scales, lengths, size, mode='fit'):
+    if mode not in BOX_MODES:
+        raise ValueError('mode must be one of {0}'.format(BOX_MODES))
+    scales = np.asarray(scales, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.float64).reshape(-1, 3)
+    size = np.asarray(size, dtype=np.float64).reshape(3)
+    use = (lengths > EPSILON) & (size > 0.0)
+    ratios = size / np.where(use, lengths, 1.0)
+    valid = use.any(axis=1)
+
+    if mode == 'stretch':
+        factors = np.where(use, ratios, 1.0)
+    else:
+        if mode == 'fit':
+            uniform = np.where(use, ratios, np.inf).min(axis=1)
+        else:
+            uniform = np.where(use, ratios, -np.inf).max(axis=1)
+        factors = np.repeat(np.where(valid, uniform, 1.0)[:, np.newaxis], 3, axis=1)
+    return (scales * factors, valid)
+
+#---------------------------------------.
+# 指定の軸を基準としたスケール値の比(Debug用).
+# @param[in] scales --> (N,3).
+# @param[in] axis --> 'x' or 'y' or 'z'.
+# @return (N,3). 基準の軸のスケール値が0のものはnan.
+#---------------------------------------.
+def scaleRatios(scales, axis):
+    scales = np.asarray(scales, dtype=np.float64)
+    base = scales[:, AXES[axis]:AXES[axis] + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(base != 0.0, scales / np.where(base != 0.0, base, 1.0), np.nan)
+
+#---------------------------------------.
+# 計算したスケール値を設定し、結果を表示.
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] scales --> 元のスケール値(N,3).
+# @param[in] lengths --> 元の長さ(N,3).
+# @param[in] new_scales --> 新しいスケール値(N,3).
+# @param[in] valid --> 設定するか(N,).
+# @param[in] start --> 処理を始めた時刻.
+# @param[in] debug --> Trueの場合は変更前後の長さ・スケール値を表示する.
+# @param[in] axis --> 比を表示するときの基準の軸.
+# @param[in] measure --> 変更後の長さを求める関数(objs --> (N,3)). Noneの場合はワールド空間の箱の長さ.
+# @return 変更後の長さ(debugの場合) または None.
+#---------------------------------------.
+def _applyScales(objs, scales, lengths, new_scales, valid, start, debug=False, axis='x', measure=None):
+    targets = [obj for obj, ok in zip(objs, valid.tolist()) if ok]
+    setScales(targets, new_scales[valid])
+    for obj, ok in zip(objs, valid.tolist()):
+        if not ok:
+            print('"{0}" is skipped. It has no length on the target axes.'.format(obj))
+
+    elapsed = timeit.default_timer() - start
+    after_lengths = None
+    if debug:
+        if measure is not None:
+            after_lengths = measure(objs)
+        else:
+            #確認用なので変更前と同じく頂点から求めた箱を使う(回転していると行列から計算した箱は大きくなる)
+            after_lengths = boxLengths(getNodeBoundingBoxes(objs))
+        print('before_obj_lengh:{0}'.format(lengths.tolist()))
+        print('before_scale_value_list:{0}'.format(scales.tolist()))
+        print('before_s_ratio:{0}'.format(scaleRatios(scales, axis).tolist()))
+        print('after_obj_lengh:{0}'.format(after_lengths.tolist()))
+        print('after_scale_value_list:{0}'.format(getScales(objs).tolist()))
+        print('after_s_ratio:{0}'.format(scaleRatios(new_scales, axis).tolist()))
+    print('Resized {0} objects in {1:.3f} sec.'.format(len(targets), elapsed))
+    return after_lengths
+
+#---------------------------------------.
+# 選択したオブジェクトの指定の軸の長さをまとめて指定の値にする.
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] axis --> 'x' or 'y' or 'z'.
+# @param[in] length --> 指定の長さ.
+# @param[in] debug --> Trueの場合は変更前後の長さ・スケール値・比を表示して確認する.
+# @return 新しいスケール値(N,3).
+#---------------------------------------.
+def resizeObjects(objs, axis, length, debug=False):
+    start = timeit.default_timer()
+    scales = getScales(objs)
+    lengths = boxLengths(getNodeBoundingBoxes(objs))
+    new_scales, valid = calcAxisScales(scales, lengths, axis, length)
+    after_lengths = _applyScales(objs, scales, lengths, new_scales, valid, start, debug, axis)
+    if debug:
+        error = np.abs(after_lengths[valid, AXES[axis]] - length)
+        print('max error:{0}'.format(error.max() if len(error) else 0.0))
+    return new_scales
+
+#---------------------------------------.
+# 選択したオブジェクトをまとめて箱(幅x高さx奥行き)に合わせる.
+# fit/fillはワールド空間の箱、stretchはローカル軸の長さで計算する(回転したグループはstretchできないので飛ばす).
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] size --> 箱の大きさ(x, y, z). 0の軸は使わない.
+# @param[in] mode --> 'fit' or 'fill' or 'stretch'.
+# @param[in] debug --> Trueの場合は変更前後の長さ・スケール値を表示する.
+# @return 新しいスケール値(N,3).
+#---------------------------------------.
+def resizeToBox(objs, size, mode='fit', debug=False):
+    start = timeit.default_timer()
+    scales = getScales(objs)
+    if mode != 'stretch':
+        lengths = boxLengths(getNodeBoundingBoxes(objs))
+        new_scales, valid = calcBoxScales(scales, lengths, size, mode)
+        _applyScales(objs, scales, lengths, new_scales, valid, start, debug)
+        return new_scales
+
+    lengths, aligned = getLocalLengths(objs, scales)
+    for obj in [obj for obj, ok in zip(objs, aligned.tolist()) if not ok]:
+        print('"{0}" is skipped. It is a rotated group, so it has no local box to stretch.'.format(obj))
+    new_scales, valid = calcBoxScales(scales, lengths, size, mode)
+    new_scales[~aligned] = scales[~aligned]
+    keep = np.flatnonzero(aligned).tolist()
+    _applyScales([objs[i] for i in keep], scales[keep], lengths[keep], new_scales[keep], valid[keep], start, debug,
+                 measure=lambda targets: getLocalLengths(targets, getScales(targets))[0])
+    return new_scales
+
+#---------------------------------------.
+# オブジェクトの大きさを基準のオブジェクトの大きさに合わせる.
+# stretchでは基準のオブジェクトもローカル軸の長さを使う(回転したグループの場合はワールド空間の箱).
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] reference --> 基準のオブジェクト名.
+# @param[in] mode --> 'fit' or 'fill' or 'stretch'.
+# @param[in] debug --> Trueの場合は変更前後の長さ・スケール値を表示する.
+# @return 新しいスケール値(N,3).
+#---------------------------------------.
+def matchReference(objs, reference, mode='stretch', debug=False):
+    size = boxLengths(getNodeBoundingBoxes([reference]))[0]
+    if mode == 'stretch':
+        lengths, aligned = getLocalLengths([reference], getScales([reference]))
+        if aligned[0]:
+            size = lengths[0]
+        else:
+            print('"{0}" is a rotated group. Its world bounding box is used as the reference size.'.format(reference))
+    return resizeToBox([obj for obj in objs if obj != reference], size, mode, debug)
+
+#---------------------------------------.
+# スケール値が1(フリーズ済み)かどうか.
+# @param[in] scales --> (N,3).
+# @param[in] tolerance --> 1との差の許容値.
+# @return (N,).
+#---------------------------------------.
+def isIdentityScale(scales, tolerance=IDENTITY_TOLERANCE):
+    return (np.abs(np.asarray(scales, dtype=np.float64).reshape(-1, 3) - 1.0) <= tolerance).all(axis=1)
+
+#---------------------------------------.
+# 子孫のトランスフォームにスケール値が1でないものがあるか(子孫はまとめて1回で取得する).
+# @param[in] objs --> オブジェクト名のリスト.
+# @return bool配列(N,).
+#---------------------------------------.
+def _hasScaledDescendants(objs):
+    result = np.zeros(len(objs), dtype=bool)
+    if not objs:
+        return result
+    paths = [obj if obj.startswith('|') else cmds.ls(obj, long=True)[0] for obj in objs]
+    descendants = cmds.listRelatives(paths, allDescendents=True, type='transform', fullPath=True) or []
+    if not descendants:
+        return result
+    scaled = [path for path, skip in zip(descendants, isIdentityScale(getScales(descendants)).tolist()) if not skip]
+
+    #スケールされた子孫のパスの途中にあるノード(祖先)に印を付ける
+    index = dict((path, i) for i, path in enumerate(paths))
+    for path in scaled:
+        parts = path.split('|')
+        for depth in range(2, len(parts)):
+            i = index.get('|'.join(parts[:depth]))
+            if i is not None:
+                result[i] = True
+    return result
+
+#---------------------------------------.
+# スケールをまとめてフリーズする.
+# 自分と子孫のトランスフォームのスケール値がすべて1のものは飛ばし(makeIdentityは子孫もフリーズするため)、
+# 残りをFREEZE_CHUNK個ずつ1回のmakeIdentityで処理する(全体で1回の取り消し単位).
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] chunk --> 1回のmakeIdentityで処理する数.
+# @param[in] progress --> Trueの場合はプログレスウィンドウを表示する(Escで中断できる).
+# @return {'frozen', 'skipped', 'cancelled', 'seconds'}.
+#---------------------------------------.
+def freezeScales(objs, chunk=FREEZE_CHUNK, progress=True):
+    start = timeit.default_timer()
+    identity = isIdentityScale(getScales(objs))
+    #スケール値が1でも、子孫にスケールされたものがあればフリーズする
+    candidates = np.flatnonzero(identity)
+    identity[candidates[_hasScaledDescendants([objs[i] for i in candidates.tolist()])]] = False
+    targets = [obj for obj, skip in zip(objs, identity.tolist()) if not skip]
+    progress = progress and bool(targets) and not cmds.about(batch=True)
+
+    frozen = 0
+    cancelled = False
+    if progress:
+        cmds.progressWindow(isInterruptable=True, title="Scale Freezing...", maxValue=len(targets), progress=0)
+    cmds.undoInfo(openChunk=True)#ヒストリをまとめる(open)
+    try:
+        for i in range(0, len(targets), chunk):
+            if progress and cmds.progressWindow(query=True, isCancelled=True):
+                cancelled = True
+                break
+            block = targets[i:i + chunk]
+            cmds.makeIdentity(block, apply=True, scale=True)#scaleフリーズ
+            frozen += len(block)
+            if progress:
+                cmds.progressWindow(edit=True, progress=frozen,
+                                    status='{0} / {1}'.format(frozen, len(targets)))
+    finally:
+        cmds.undoInfo(closeChunk=True)#ヒストリをまとめる(close)
+        if progress:
+            cmds.progressWindow(endProgress=True)
+
+    elapsed = timeit.default_timer() - start
+    print('Froze scale of {0} objects ({1} already frozen{2}) in {3:.3f} sec.'.format(
+        frozen, len(objs) - len(targets), ', cancelled' if cancelled else '', elapsed))
+    return {'frozen': frozen, 'skipped': len(objs) - len(targets), 'cancelled': cancelled, 'seconds': elapsed}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import namedtuple
+import timeit
+
+import numpy as np
+
+import maya.cmds as cmds
+
+from ..common.meshGeometry import getPolygons, getUVs, polygonAreas
+from ..common.snapshotCache import getWorldPoints
+from .textureCore import getFileNodeSizes, getShadingResolver
+
+#テクセル密度(ワールドの1単位あたりのピクセル数)をそろえる
+#match_size(平面のXZだけ)と違い、任意の形のメッシュを面積から計算する
+
+#目標のテクセル密度(px/unit). match_sizeの ratio=0.01 (100pxで1単位) と同じ
+TARGET_DENSITY = 100.0
+
+#mesh --> オブジェクト名
+#texture --> ファイルノード名(ない場合はNone)
+#worldArea --> ワールド空間の表面積
+#uvArea --> UV空間の面積(0-1空間で1が画像全体)
+#density --> 現在のテクセル密度(px/unit). 計算できない場合はNone
+#scale --> 目標の密度にするための均一スケール. 計算できない場合はNone
+TexelReport = namedtuple('TexelReport', ['mesh', 'texture', 'worldArea', 'uvArea', 'density', 'scale'])
+
+#---------------------------------------.
+# メッシュのワールド空間の表面積とUV面積を計算.
+# @param[in] mesh --> メッシュ名.
+# @param[in] uvSet --> UVセット名(Noneの場合は現在のUVセット).
+# @return (ワールド面積, UV面積). UVのない多角形は両方から除く.
+#---------------------------------------.
+def getMeshAreas(mesh, uvSet=None):
+    counts, connects = getPolygons(mesh)
+    uvs, uv_counts, uv_ids = getUVs(mesh, uvSet)
+    world_areas = polygonAreas(getWorldPoints(mesh), counts, connects)
+    uv_areas = polygonAreas(uvs, uv_counts, uv_ids)
+    mapped = uv_counts > 0
+    return (float(world_areas[mapped].sum()), float(uv_areas[mapped].sum()))
+
+#---------------------------------------.
+# 面積と画像サイズからテクセル密度を計算.
+# @param[in] world_area --> ワールド面積.
+# @param[in] uv_area --> UV面積.
+# @param[in] file_size --> 画像の(幅, 高さ).
+# @return テクセル密度(px/unit). 計算できない場合はNone.
+#---------------------------------------.
+def calcTexelDensity(world_area, uv_area, file_size):
+    if not file_size or world_area <= 0.0 or uv_area <= 0.0:
+        return None
+    return float(np.sqrt(uv_area * file_size[0] * file_size[1] / world_area))
+
+#---------------------------------------.
+# オブジェクトごとのテクセル密度を調べる.
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] target --> 目標のテクセル密度(px/unit).
+# @param[in] uvSet --> UVセット名(Noneの場合は現在のUVセット).
+# @return TexelReportのリスト. objsと同じ順番.
+#---------------------------------------.
+def checkTexelDensity(objs, target=TARGET_DENSITY, uvSet=None):
+    file_nodes = getShadingResolver().fileNodes(objs)
+    _sizes = iter(getFileNodeSizes([file_node for file_node in file_nodes if file_node]))
+    file_sizes = [next(_sizes) if file_node else None for file_node in file_nodes]
+
+    reports = []
+    for obj, file_node, file_size in zip(objs, file_nodes, file_sizes):
+        if not file_node:
+            reports.append(TexelReport(obj, None, 0.0, 0.0, None, None))
+            continue
+        world_area, uv_area = getMeshAreas(obj, uvSet)
+        density = calcTexelDensity(world_area, uv_area, file_size)
+        scale = density / target if density else None
+        reports.append(TexelReport(obj, file_node, world_area, uv_area, density, scale))
+    return reports
+
+#---------------------------------------.
+# テクセル密度を目標の値にそろえる.
+# @param[in] target --> 目標のテクセル密度(px/unit).
+# @param[in] objs --> オブジェクト名のリスト. Noneの場合は選択したもの(選択がなければシーンのすべてのメッシュ).
+# @param[in] apply --> Falseの場合は調べて表示するだけでスケールしない.
+# @param[in] uvSet --> UVセット名(Noneの場合は現在のUVセット).
+# @param[in] tolerance --> スケールとの差がこれ以下のものは変更しない.
+# @return TexelReportのリスト.
+#---------------------------------------.
+def normalizeTexelDensity(target=TARGET_DENSITY, objs=None, apply=True, uvSet=None, tolerance=1.0e-4):
+    start = timeit.default_timer()
+    if objs is None:
+        objs = cmds.ls(selection=True, long=True)
+        if not objs:
+            shapes = cmds.ls(type='mesh', noIntermediate=True, long=True) or []
+            objs = list(set(cmds.listRelatives(shapes, parent=True, fullPath=True) or []))
+            objs.sort()
+
+    reports = checkTexelDensity(objs, target, uvSet)
+
+    scaled = 0
+    if apply:
+        cmds.undoInfo(openChunk=True)
+        try:
+            for report in reports:
+                if report.scale and abs(report.scale - 1.0) > tolerance:
+                    cmds.scale(report.scale, report.scale, report.scale, report.mesh, relative=True)
+                    scaled += 1
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    for report in reports:
+        if report.density is None:
+            print('{0}: skipped ({1})'.format(report.mesh, 'no texture' if report.texture is None else 'no area'))
+        else:
+            print('{0}: {1:.2f} px/unit (texture={2}, scale={3:.4f})'.format(
+                report.mesh, report.density, report.texture, report.scale))
+    print('Checked {0} meshes, scaled {1} to {2} px/unit in {3:.3f} sec.'.format(
+        len(reports), scaled, target, timeit.default_timer() - start))
+    return reports
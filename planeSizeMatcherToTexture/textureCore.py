@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import OrderedDict
+import os
+
+import numpy as np
+
+import maya.cmds as cmds
+
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+from ..common.meshGeometry import getUVs
+from ..common.snapshotCache import getNodeBoundingBoxes
+from .textureIndex import getIndex
+
+#planeSizeMatcherToTexture.py と planeSizeMatcherToTexture_ui.py で共有する処理
+#(planeSizeMatcherToTexture.py はimportすると実行されるのでこちらに置く)
+
+#マテリアルの種類 --> テクスチャをつなぐ色のアトリビュート
+COLOR_ATTRIBUTES = {
+    'lambert': 'color',
+    'blinn': 'color',
+    'phong': 'color',
+    'phongE': 'color',
+    'anisotropic': 'color',
+    'rampShader': 'color',
+    'surfaceShader': 'outColor',
+    'standardSurface': 'baseColor',
+    'openPBRSurface': 'baseColor',
+    'aiStandardSurface': 'baseColor',
+    'aiLambert': 'Kd_color',
+    'aiFlat': 'color',
+    'usdPreviewSurface': 'diffuseColor',
+    'VRayMtl': 'color',
+    'RedshiftMaterial': 'diffuse_color',
+    'RedshiftStandardMaterial': 'base_color',
+}
+#上の表にないマテリアルで順に探すアトリビュート
+FALLBACK_COLOR_ATTRIBUTES = ('baseColor', 'color')
+
+#---------------------------------------.
+# ファイルノードの画像ファイルのフルパスを取得.
+# 環境変数を展開し、相対パスはプロジェクトのフォルダから探す.
+# @param[in] file_node --> ファイルノード名.
+# @return パス. 設定されていない場合は''.
+#---------------------------------------.
+def getTexturePath(file_node):
+    path = cmds.getAttr(file_node + '.fileTextureName') or ''
+    if not path:
+        return ''
+    path = os.path.expandvars(path)
+    if not os.path.isabs(path):
+        path = cmds.workspace(expandName=path)
+    return os.path.normpath(path)
+
+#---------------------------------------.
+# ファイルノードの画像のサイズをまとめて取得.
+# 画像ファイルの索引(textureIndex)を使うので、変更されていない画像は読まない. 変更された画像もヘッダーだけを読む.
+# 同じ画像ファイル(アトラスなど)を使うファイルノードはまとめて1回だけ調べる.
+# 索引で分からない場合(UDIMやシーケンス、未対応の形式など)だけ outSizeX/outSizeY を使う.
+# @param[in] file_nodes --> ファイルノード名のリスト.
+# @return (幅, 高さ)のリスト. file_nodesと同じ順番.
+#---------------------------------------.
+def getFileNodeSizes(file_nodes):
+    #同じファイルノードは1回だけ調べる
+    unique = list(OrderedDict.fromkeys(file_nodes))
+    paths = [getTexturePath(file_node) for file_node in unique]
+    infos = getIndex().lookup(list(OrderedDict.fromkeys(path for path in paths if path)))
+    sizes = {}
+    path_sizes = {}
+    for file_node, path in zip(unique, paths):
+        if path and path in path_sizes:
+            sizes[file_node] = path_sizes[path]
+            continue
+        info = infos.get(path) if path else None
+        if info is None:
+            sizes[file_node] = (cmds.getAttr(file_node + '.outSizeX'), cmds.getAttr(file_node + '.outSizeY'))
+        else:
+            sizes[file_node] = (info.width, info.height)
+        if path:
+            path_sizes[path] = sizes[file_node]
+    return [sizes[file_node] for file_node in file_nodes]
+
+#---------------------------------------.
+# ファイルノードの画像のサイズを取得.
+# @param[in] file_node --> ファイルノード名.
+# @return (幅, 高さ).
+#---------------------------------------.
+def getFileNodeSize(file_node):
+    return getFileNodeSizes([file_node])[0]
+
+#---------------------------------------.
+# オブジェクトのUVの範囲を取得(多角形に割り当てられているUVだけを使う).
+# @param[in] obj --> オブジェクト名.
+# @param[in] uvSet --> UVセット名(Noneの場合は現在のUVセット).
+# @return (uの幅, vの幅). UVがない場合はNone.
+#---------------------------------------.
+def getUVExtent(obj, uvSet=None):
+    uvs, uv_counts, uv_ids = getUVs(obj, uvSet)
+    if not len(uv_ids):
+        return None
+    used = uvs[np.unique(uv_ids)]
+    extent = used.max(axis=0) - used.min(axis=0)
+    return (float(extent[0]), float(extent[1]))
+
+#---------------------------------------.
+# アトラスのように画像の一部だけを表示している場合の、表示されているピクセル数を取得.
+# UVの範囲(0-1空間)に画像のサイズを掛ける. 画像のサイズはファイルごとに1回だけ調べる.
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] file_nodes --> objsと同じ順番のファイルノード名(ない場合はNone)のリスト.
+# @param[in] uvSet --> UVセット名(Noneの場合は現在のUVセット).
+# @return (幅, 高さ)(ピクセル)のリスト. ファイルノードやUVがない場合はNone.
+#---------------------------------------.
+def getDisplayedSizes(objs, file_nodes, uvSet=None):
+    _sizes = iter(getFileNodeSizes([file_node for file_node in file_nodes if file_node]))
+    file_sizes = [next(_sizes) if file_node else None for file_node in file_nodes]
+    result = []
+    for obj, file_size in zip(objs, file_sizes):
+        extent = getUVExtent(obj, uvSet) if file_size else None
+        if extent is None or extent[0] <= 0.0 or extent[1] <= 0.0:
+            result.append(None)
+        else:
+            result.append((file_size[0] * extent[0], file_size[1] * extent[1]))
+    return result
+
+#---------------------------------------.
+# プロジェクトのsourceimagesフォルダ(または指定のフォルダ)をスキャンして画像ファイルの索引を更新.
+# @param[in] directories --> フォルダのリスト(Noneの場合はプロジェクトのsourceimages).
+# @return TextureIndex.scanの戻り値.
+#---------------------------------------.
+def refreshTextureIndex(directories=None):
+    if directories is None:
+        rule = cmds.workspace(fileRuleEntry='sourceImages') or 'sourceimages'
+        directories = [cmds.workspace(expandName=rule)]
+    result = getIndex().scan(directories)
+    print('Indexed {0} textures ({1} updated, {2} removed) in {3:.3f} sec.'.format(
+        result['files'], result['updated'], result['removed'], result['seconds']))
+    return result
+
+#---------------------------------------.
+# シェイプ --> シェーディンググループ --> マテリアル --> ファイルノード をたどる.
+# 各段階の結果をノードごとに覚えておくので、同じシェーディンググループやマテリアルを共有するオブジェクトは1回しか調べない.
+# watch=Trueの場合はシェーディングに関わる接続が変わったときに、その段階の覚えた結果だけを捨てる.
+# 監視のコールバックはclose()で外す(使い終わったらcloseShadingResolverを呼ぶ).
+# @param[in] watch --> Trueの場合は接続の変更を監視する.
+#---------------------------------------.
+class ShadingResolver(object):
+    def __init__(self, watch=False):
+        self._shapes = {}
+        self._engines = {}
+        self._materials = {}
+        self._files = {}
+        self._callback = None
+        if watch and om is not None:
+            self._callback = om.MDGMessage.addConnectionCallback(self._onConnection)
+
+    def _onConnection(self, src, dst, made, clientData):
+        src_node, dst_node = src.node(), dst.node()
+        #シェイプの作成・削除
+        if src_node.hasFn(om.MFn.kShape) or dst_node.hasFn(om.MFn.kShape):
+            self._shapes.clear()
+        #割り当て(シェイプ --> シェーディンググループ)とsurfaceShaderの変更
+        if src_node.hasFn(om.MFn.kShadingEngine) or dst_node.hasFn(om.MFn.kShadingEngine):
+            self._engines.clear()
+            self._materials.clear()
+        #テクスチャからの接続と、調べたことのあるマテリアルへの接続
+        elif src_node.hasFn(om.MFn.kTexture2d) or om.MFnDependencyNode(dst_node).name() in self._files:
+            self._files.clear()
+
+    def clear(self):
+        self._shapes.clear()
+        self._engines.clear()
+        self._materials.clear()
+        self._files.clear()
+
+    def close(self):
+        if self._callback is not None:
+            om.MMessage.removeCallback(self._callback)
+            self._callback = None
+
+    #---------------------------------------.
+    # オブジェクトのシェイプ(中間オブジェクトを除く).
+    #---------------------------------------.
+    def shapes(self, obj):
+        if obj not in self._shapes:
+            if cmds.ls(obj, shapes=True):
+                shapes = [obj]
+            else:
+                shapes = cmds.listRelatives(obj, shapes=True, noIntermediate=True, fullPath=True) or []
+            self._shapes[obj] = shapes
+        return self._shapes[obj]
+
+    #---------------------------------------.
+    # シェイプが接続されているシェーディンググループ(重複なし).
+    #---------------------------------------.
+    def shadingEngines(self, shape):
+        if shape not in self._engines:
+            engines = cmds.listConnections(shape, source=False, destination=True, type='shadingEngine') or []
+            self._engines[shape] = list(OrderedDict.fromkeys(engines))
+        return self._engines[shape]
+
+    #---------------------------------------.
+    # シェーディンググループのsurfaceShaderに接続されているマテリアル.
+    #---------------------------------------.
+    def material(self, engine):
+        if engine not in self._materials:
+            materials = cmds.listConnections(engine + '.surfaceShader', source=True, destination=False) or []
+            self._materials[engine] = materials[0] if materials else None
+        return self._materials[engine]
+
+    #---------------------------------------.
+    # マテリアルの色のアトリビュートに接続されているファイルノード.
+    # 直接つながっていない場合(colorCorrectなどを挟む場合)は上流からファイルノードを探す.
+    #---------------------------------------.
+    def fileNode(self, material):
+        if material not in self._files:
+            self._files[material] = None
+            material_type = cmds.nodeType(material)
+            if material_type in COLOR_ATTRIBUTES:
+                attrs = [COLOR_ATTRIBUTES[material_type]]
+            else:
+                attrs = [attr for attr in FALLBACK_COLOR_ATTRIBUTES if cmds.attributeQuery(attr, node=material, exists=True)]
+            for attr in attrs:
+                inputs = cmds.listConnections('{0}.{1}'.format(material, attr), source=True, destination=False) or []
+                files = cmds.ls(inputs, type='file')
+                if not files and inputs:
+                    files = cmds.ls(cmds.listHistory(inputs[0]) or [], type='file')
+                if files:
+                    self._files[material] = files[0]
+                    break
+        return self._files[material]
+
+    #---------------------------------------.
+    # オブジェクトごとのファイルノードを取得.
+    # シェイプに複数のマテリアルが割り当てられている場合は最初にファイルノードが見つかったものを使う.
+    # @param[in] objs --> オブジェクト名のリスト.
+    # @return ファイルノード名(見つからない場合はNone)のリスト. objsと同じ順番.
+    #---------------------------------------.
+    def fileNodes(self, objs):
+        result = []
+        for obj in objs:
+            file_node = None
+            for shape in self.shapes(obj):
+                for engine in self.shadingEngines(shape):
+                    material = self.material(engine)
+                    file_node = self.fileNode(material) if material else None
+                    if file_node:
+                        break
+                if file_node:
+                    break
+            result.append(file_node)
+        return result
+
+_resolver = [None]
+
+#---------------------------------------.
+# 共有のShadingResolverを取得(接続が変わるまで結果を使い回す).
+# @return ShadingResolver.
+#---------------------------------------.
+def getShadingResolver():
+    if _resolver[0] is None:
+        _resolver[0] = ShadingResolver(watch=True)
+    return _resolver[0]
+
+#---------------------------------------.
+# 共有のShadingResolverの監視をやめて捨てる(UIを閉じたときなど). 次に使うときに作り直す.
+#---------------------------------------.
+def closeShadingResolver():
+    if _resolver[0] is not None:
+        _resolver[0].close()
+        _resolver[0] = None
+
+
+#---------------------------------------.
+# 選択した平面の大きさと、割り当てられているテクスチャのサイズを取得.
+# @param[in] use_uv_bounds --> Trueの場合はUVの範囲 x 画像のサイズ(アトラスの一部)をテクスチャのサイズとする.
+# @return (オブジェクト名のリスト, 平面の(幅x, 高さz)のリスト, テクスチャの(幅, 高さ)のリスト).
+#         ファイルノードがないものはどちらのサイズもNone.
+#---------------------------------------.
+def check_size(use_uv_bounds=False):
+    #選択したオブジェクトのリストを取得
+    objs = cmds.ls(selection=True,long=True)
+
+    #各オブジェクトのシェイプ --> シェーディンググループ --> マテリアル --> ファイルノード をたどる
+    #同じシェーディンググループやマテリアルは1回だけ調べ、objsと同じ順番で返す(ファイルノードがない場合はNone)
+    file_names = getShadingResolver().fileNodes(objs)
+
+    if use_uv_bounds:
+        #アトラス: UVの範囲 x 画像のサイズ を表示されているピクセル数とする(同じ画像ファイルは1回だけ調べる)
+        file_sizes = getDisplayedSizes(objs, file_names)
+    else:
+        #ファイルのサイズを画像ファイルの索引からまとめて取得する(読めない場合はoutSizeX/outSizeY)
+        _sizes = iter(getFileNodeSizes([_file_name for _file_name in file_names if _file_name]))
+        file_sizes = [next(_sizes) if _file_name else None for _file_name in file_names]
+
+    #バウンディングボックスのサイズを取得してオブジェクトの高さ(z)と幅(x)を取得する(ﾊﾞｳﾝﾃﾞｨﾝｸﾞﾎﾞｯｸｽ-->[-x,-y,-z,x,y,z])
+    #ファイルノードがあるものだけ、キャッシュしたオブジェクト空間の箱とワールド行列からまとめて計算する
+    _boxes = iter(getNodeBoundingBoxes([obj for obj, file_name in zip(objs, file_names) if file_name], exact=False).tolist())
+    obj_sizes = []
+    for obj, file_name in zip(objs, file_names):
+        if file_name:
+            box = next(_boxes)
+            obj_sizes.append((abs(box[3] - box[0]), abs(box[5] - box[2])))#(width, height)-->(x_lengh, z_lengh)
+        else:
+            obj_sizes.append(None)
+
+    return (objs,obj_sizes,file_sizes)
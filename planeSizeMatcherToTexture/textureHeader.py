@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import OrderedDict, namedtuple
+import os
+import struct
+import threading
+
+#画像ファイルのヘッダーだけを読んで幅・高さ・チャンネル数を取得する(画像は読み込まない)
+#対応形式: PNG, JPEG, TGA, TIFF(.tx含む), EXR, DDS, PSD
+
+#キャッシュする画像の数
+CACHE_SIZE = 4096
+#JPEGでSOFを探すときに読む最大バイト数(Exifのサムネイルなどを飛ばす)
+JPEG_SCAN_LIMIT = 1024 * 1024
+
+#channelsは不明な場合はNone
+ImageInfo = namedtuple('ImageInfo', ['width', 'height', 'channels'])
+
+#(パス, 更新日時) --> ImageInfo または None(読めなかった)
+_cache = OrderedDict()
+#textureIndexのスレッドからも使うので_cacheの操作はロックする
+_lock = threading.Lock()
+
+def _unpack(fmt, data, offset=0):
+    return struct.unpack_from(fmt, data, offset)
+
+def _readPNG(f, head):
+    if head[:8] != b'\x89PNG\r\n\x1a\n' or head[12:16] != b'IHDR':
+        return None
+    width, height, depth, color = _unpack('>IIBB', head, 16)
+    #カラータイプ --> チャンネル数(パレットはRGBとして扱う)
+    channels = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}.get(color)
+    return ImageInfo(width, height, channels)
+
+def _readJPEG(f, head):
+    if head[:2] != b'\xff\xd8':
+        return None
+    f.seek(2)
+    data = f.read(JPEG_SCAN_LIMIT)
+    pos = 0
+    while pos + 4 <= len(data):
+        if data[pos:pos + 1] != b'\xff':
+            pos += 1
+            continue
+        marker = bytearray(data[pos + 1:pos + 2])[0]
+        if marker == 0xff:
+            pos += 1
+            continue
+        #長さを持たないマーカー
+        if marker in (0x01, 0xd8) or 0xd0 <= marker <= 0xd7:
+            pos += 2
+            continue
+        length = _unpack('>H', data, pos + 2)[0]
+        #SOF0-15 (DHT, JPG, DACを除く)
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            if pos + 10 > len(data):
+                return None
+            height, width, channels = _unpack('>HHB', data, pos + 5)
+            return ImageInfo(width, height, channels)
+        pos += 2 + length
+    return None
+
+def _readTGA(f, head):
+    if len(head) < 18:
+        return None
+    cmap_type, image_type = bytearray(head[1:3])
+    if cmap_type > 1 or image_type not in (1, 2, 3, 9, 10, 11):
+        return None
+    width, height, bits = _unpack('<HHB', head, 12)
+    if image_type in (1, 9):
+        channels = 3
+    elif image_type in (3, 11):
+        channels = 1
+    else:
+        channels = bits // 8
+    return ImageInfo(width, height, channels)
+
+def _readTIFF(f, head):
+    if head[:4] in (b'II*\x00', b'MM\x00*'):
+        big = False
+    elif head[:4] in (b'II+\x00', b'MM\x00+'):
+        big = True
+    else:
+        return None
+    endian = '<' if head[:2] == b'II' else '>'
+
+    #最初のIFDのエントリから 幅(256) 高さ(257) チャンネル数(277) を探す
+    if big:
+        f.seek(_unpack(endian + 'Q', head, 8)[0])
+        count = _unpack(endian + 'Q', f.read(8))[0]
+        entry_size, value_offset = 20, 12
+    else:
+        f.seek(_unpack(endian + 'I', head, 4)[0])
+        count = _unpack(endian + 'H', f.read(2))[0]
+        entry_size, value_offset = 12, 8
+    entries = f.read(count * entry_size)
+    tags = {}
+    for i in range(len(entries) // entry_size):
+        base = i * entry_size
+        tag, kind = _unpack(endian + 'HH', entries, base)
+        if tag not in (256, 257, 277):
+            continue
+        #SHORT(3) or LONG(4) or LONG8(16)
+        fmt = {3: 'H', 4: 'I', 16: 'Q'}.get(kind)
+        if fmt:
+            tags[tag] = _unpack(endian + fmt, entries, base + value_offset)[0]
+    if 256 not in tags or 257 not in tags:
+        return None
+    return ImageInfo(tags[256], tags[257], tags.get(277, 1))
+
+def _readEXR(f, head):
+    if head[:4] != b'\x76\x2f\x31\x01':
+        return None
+    f.seek(8)
+    width = height = channels = None
+
+    #属性: 名前\0 型\0 サイズ(int32) 値. 空の名前でヘッダーが終わる
+    def readString():
+        chars = []
+        while True:
+            c = f.read(1)
+            if not c or c == b'\x00':
+                return b''.join(chars)
+            chars.append(c)
+
+    while True:
+        name = readString()
+        if not name:
+            break
+        kind = readString()
+        size = _unpack('<i', f.read(4))[0]
+        value = f.read(size)
+        if name == b'dataWindow' and kind == b'box2i':
+            x_min, y_min, x_max, y_max = _unpack('<iiii', value)
+            width, height = x_max - x_min + 1, y_max - y_min + 1
+        elif name == b'channels' and kind == b'chlist':
+            #チャンネル名\0 + 16バイト の繰り返し. 空の名前で終わる
+            channels, pos = 0, 0
+            while pos < len(value) and value[pos:pos + 1] != b'\x00':
+                pos = value.index(b'\x00', pos) + 1 + 16
+                channels += 1
+        if width is not None and channels is not None:
+            break
+    if width is None:
+        return None
+    return ImageInfo(width, height, channels)
+
+def _readDDS(f, head):
+    if head[:4] != b'DDS ' or len(head) < 92:
+        return None
+    height, width = _unpack('<II', head, 12)
+    pf_flags, four_cc, bit_count = _unpack('<I4sI', head, 80)
+    if pf_flags & 0x4:#DDPF_FOURCC
+        channels = {b'DXT1': 3, b'BC4U': 1, b'ATI1': 1, b'BC5U': 2, b'ATI2': 2}.get(four_cc, 4)
+    elif pf_flags & 0x40:#DDPF_RGB
+        channels = 4 if pf_flags & 0x1 else 3
+    else:
+        channels = None
+    return ImageInfo(width, height, channels)
+
+def _readPSD(f, head):
+    if head[:4] != b'8BPS':
+        return None
+    channels, height, width = _unpack('>HII', head, 12)
+    return ImageInfo(width, height, channels)
+
+#シグネチャで判定できるもの
+_READERS = (_readPNG, _readJPEG, _readTIFF, _readEXR, _readDDS, _readPSD)
+
+#---------------------------------------.
+# 画像ファイルのヘッダーから幅・高さ・チャンネル数を読む(キャッシュを使わない).
+# @param[in] path --> 画像ファイルのパス.
+# @return ImageInfo. 読めない場合はNone.
+#---------------------------------------.
+def readImageInfo(path):
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(128)
+            for reader in _READERS:
+                f.seek(0)
+                info = reader(f, head)
+                if info is not None:
+                    return info
+            #TGAはシグネチャがないので拡張子で判定
+            if os.path.splitext(path)[1].lower() in ('.tga', '.targa'):
+                return _readTGA(f, head)
+    except (IOError, OSError, struct.error, ValueError, IndexError):
+        pass
+    return None
+
+#---------------------------------------.
+# 画像ファイルの幅・高さ・チャンネル数を取得. (パス, 更新日時)が同じならキャッシュを使う.
+# @param[in] path --> 画像ファイルのパス.
+# @param[in] mtime --> 更新日時(Noneの場合はファイルから取得する).
+# @return ImageInfo. ファイルがない場合や読めない場合はNone.
+#---------------------------------------.
+def getImageInfo(path, mtime=None):
+    if mtime is None:
+        try:
+            mtime = os.path.getmtime(path)
+        except (IOError, OSError):
+            return None
+    key = (path, mtime)
+    with _lock:
+        if key in _cache:
+            #最近使ったものとして末尾へ移す
+            info = _cache.pop(key)
+            _cache[key] = info
+            return info
+
+    info = readImageInfo(path)
+    with _lock:
+        _cache[key] = info
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return info
+
+#---------------------------------------.
+# 画像ファイルの幅と高さを取得.
+# @param[in] path --> 画像ファイルのパス.
+# @return (幅, 高さ). 読めない場合はNone.
+#---------------------------------------.
+def getImageSize(path):
+    info = getImageInfo(path)
+    return (info.width, info.height) if info else None
+
+#---------------------------------------.
+# キャッシュを削除.
+#---------------------------------------.
+def clearCache():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from multiprocessing.pool import ThreadPool
+import os
+import sqlite3
+import timeit
+
+from .textureHeader import ImageInfo, getImageInfo
+
+#画像ファイルの幅・高さ・チャンネル数をSQLiteに保存しておく索引
+#ファイルサイズと更新日時が変わったものだけヘッダーを読み直す
+
+#索引ファイルの既定の場所(環境変数 TEXTURE_INDEX_PATH で変更できる)
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.planeSizeMatcherToTexture', 'textureIndex.db')
+#スキャンするファイルの拡張子
+EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tga', '.tif', '.tiff', '.tx', '.exr', '.dds', '.psd')
+#ヘッダーを読むスレッド数
+THREADS = 8
+#1回のSQLで問い合わせるパスの数(SQLiteの変数の上限は999)
+QUERY_CHUNK = 500
+
+_SCHEMA = '''CREATE TABLE IF NOT EXISTS textures (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    channels INTEGER
+)'''
+
+#---------------------------------------.
+# 索引で使うパスの表記をそろえる.
+# @param[in] path --> パス.
+# @return 正規化したパス.
+#---------------------------------------.
+def normalizePath(path):
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+#---------------------------------------.
+# ファイルのサイズと更新日時.
+# @return (サイズ, 更新日時). ファイルがない場合はNone.
+#---------------------------------------.
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except (IOError, OSError):
+        return None
+    return (st.st_size, st.st_mtime)
+
+#---------------------------------------.
+# スレッドで実行する処理. ヘッダーを読む(同じ更新日時のものはtextureHeaderのキャッシュを使う).
+#---------------------------------------.
+def _readRow(item):
+    path, (size, mtime) = item
+    info = getImageInfo(path, mtime)
+    if info is None:
+        return (path, size, mtime, None, None, None)
+    return (path, size, mtime, info.width, info.height, info.channels)
+
+#---------------------------------------.
+# 画像ファイルの索引.
+# @param[in] path --> 索引ファイルのパス(Noneの場合は既定の場所). ':memory:' でメモリ上に作る.
+#---------------------------------------.
+class TextureIndex(object):
+    def __init__(self, path=None):
+        if path is None:
+            path = os.environ.get('TEXTURE_INDEX_PATH', DEFAULT_PATH)
+        if path != ':memory:' and not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(_SCHEMA)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM textures').fetchone()[0]
+
+    #---------------------------------------.
+    # 索引に保存されている行をまとめて取得.
+    # @param[in] paths --> 正規化したパスのリスト.
+    # @return {パス: (サイズ, 更新日時, 幅, 高さ, チャンネル数)}.
+    #---------------------------------------.
+    def _rows(self, paths):
+        rows = {}
+        for start in range(0, len(paths), QUERY_CHUNK):
+            chunk = paths[start:start + QUERY_CHUNK]
+            sql = 'SELECT path, size, mtime, width, height, channels FROM textures WHERE path IN ({0})'.format(
+                ','.join('?' * len(chunk)))
+            for row in self.connection.execute(sql, chunk):
+                rows[row[0]] = row[1:]
+        return rows
+
+    #---------------------------------------.
+    # サイズか更新日時が変わったファイルのヘッダーをスレッドで読み、索引を更新.
+    # @param[in] stats --> {正規化したパス: (サイズ, 更新日時)}.
+    # @param[in] threads --> スレッド数.
+    # @return 更新したファイルの数.
+    #---------------------------------------.
+    def _refresh(self, stats, threads=THREADS):
+        rows = self._rows(list(stats))
+        changed = [(path, stat) for path, stat in stats.items()
+                   if path not in rows or tuple(rows[path][:2]) != stat]
+        if not changed:
+            return 0
+        if len(changed) == 1 or threads <= 1:
+            results = [_readRow(item) for item in changed]
+        else:
+            pool = ThreadPool(min(threads, len(changed)))
+            try:
+                results = pool.map(_readRow, changed)
+            finally:
+                pool.close()
+                pool.join()
+        self.connection.executemany('INSERT OR REPLACE INTO textures VALUES (?, ?, ?, ?, ?, ?)', results)
+        self.connection.commit()
+        return len(results)
+
+    #---------------------------------------.
+    # フォルダ以下の画像ファイルをスキャンして索引を更新する.
+    # 変更がないファイルは読まず、なくなったファイルは索引から削除する.
+    # @param[in] directories --> フォルダのリスト.
+    # @param[in] extensions --> 対象の拡張子.
+    # @param[in] threads --> ヘッダーを読むスレッド数.
+    # @return {'files', 'updated', 'removed', 'seconds'}.
+    #---------------------------------------.
+    def scan(self, directories, extensions=EXTENSIONS, threads=THREADS):
+        start = timeit.default_timer()
+        stats = {}
+        prefixes = []
+        for directory in directories:
+            directory = normalizePath(directory)
+            prefixes.append(os.path.join(directory, ''))
+            for root, dirs, files in os.walk(directory):
+                for name in files:
+                    if os.path.splitext(name)[1].lower() in extensions:
+                        path = normalizePath(os.path.join(root, name))
+                        stat = _stat(path)
+                        if stat:
+                            stats[path] = stat
+
+        updated = self._refresh(stats, threads)
+
+        #スキャンしたフォルダの中で、なくなったファイルを削除
+        removed = []
+        for prefix in prefixes:
+            sql = 'SELECT path FROM textures WHERE substr(path, 1, ?) = ?'
+            removed += [row[0] for row in self.connection.execute(sql, (len(prefix), prefix)) if row[0] not in stats]
+        if removed:
+            self.connection.executemany('DELETE FROM textures WHERE path = ?', [(path,) for path in removed])
+            self.connection.commit()
+
+        return {'files': len(stats), 'updated': updated, 'removed': len(removed),
+                'seconds': timeit.default_timer() - start}
+
+    #---------------------------------------.
+    # 画像ファイルの幅・高さ・チャンネル数をまとめて取得.
+    # validate=Trueの場合はファイルのサイズと更新日時を確認し、変わったもの(と索引にないもの)だけヘッダーを読み直す.
+    # @param[in] paths --> パスのリスト.
+    # @param[in] validate --> Falseの場合は索引の値をそのまま使う(ファイルにアクセスしない).
+    # @return {パス(引数のまま): ImageInfo または None(読めない・ない)}.
+    #---------------------------------------.
+    def lookup(self, paths, validate=True):
+        keys = dict((path, normalizePath(path)) for path in paths)
+        if validate:
+            stats = {}
+            for key in set(keys.values()):
+                stat = _stat(key)
+                if stat:
+                    stats[key] = stat
+            self._refresh(stats)
+        rows = self._rows(list(set(keys.values())))
+
+        result = {}
+        for path, key in keys.items():
+            row = rows.get(key)
+            if validate and key not in stats:
+                row = None
+            result[path] = ImageInfo(*row[2:]) if row and row[2] is not None else None
+        return result
+
+_index = [None]
+
+#---------------------------------------.
+# 共有の索引を取得(最初に使うときに既定の場所で開く).
+# @return TextureIndex.
+#---------------------------------------.
+def getIndex():
+    if _index[0] is None:
+        _index[0] = TextureIndex()
+    return _index[0]
+
+#---------------------------------------.
+# 共有の索引を差し替える.
+# @param[in] index --> TextureIndex.
+#---------------------------------------.
+def setIndex(index):
+    _index[0] = index
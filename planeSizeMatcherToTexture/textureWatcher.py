@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import OrderedDict
+import os
+import timeit
+
+import maya.cmds as cmds
+
+try:
+    from PySide2 import QtCore
+except ImportError:
+    QtCore = None
+
+from ..common.snapshotCache import getNodeBoundingBoxes
+from .textureCore import getDisplayedSizes, getFileNodeSizes, getShadingResolver, getTexturePath
+
+#画像ファイルが保存し直されたら、その画像を使っている平面だけをもう一度テクスチャのサイズに合わせる
+#ファイルの更新はサイズと更新日時を定期的に調べて見つける(ポーリング)
+
+#ファイルを調べる間隔(ミリ秒)
+POLL_INTERVAL = 1000
+#最後の変更からこの秒数だけ変更がなければ更新する(連続した保存を1回にまとめる)
+SETTLE_TIME = 0.5
+
+#---------------------------------------.
+# ファイルのサイズと更新日時.
+# @return (サイズ, 更新日時). ファイルがない場合はNone.
+#---------------------------------------.
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except (IOError, OSError):
+        return None
+    return (st.st_size, st.st_mtime)
+
+#---------------------------------------.
+# 画像ファイルの変更を監視して平面のサイズを合わせ直す.
+# @param[in] ratio --> match_sizeと同じ比率(1ピクセルあたりの大きさ).
+# @param[in] use_uv_bounds --> Trueの場合はUVの範囲(アトラスの一部)に合わせる.
+# @param[in] settle --> 最後の変更からこの秒数だけ待ってから更新する.
+#---------------------------------------.
+class TextureWatcher(object):
+    def __init__(self, ratio=0.01, use_uv_bounds=False, settle=SETTLE_TIME):
+        self.ratio = ratio
+        self.use_uv_bounds = use_uv_bounds
+        self.settle = settle
+        #画像のパス --> その画像を使っているオブジェクト
+        self._objects = OrderedDict()
+        #オブジェクト --> (ファイルノード, 画像のパス)
+        self._fileNodes = {}
+        #画像のパス --> 最後に合わせたときの(サイズ, 更新日時)
+        self._stats = {}
+        #画像のパス --> 変更を見つけたときの(サイズ, 更新日時)
+        self._pending = {}
+        self._lastChange = None
+        self._timer = None
+
+    def __len__(self):
+        return len(self._fileNodes)
+
+    #---------------------------------------.
+    # 監視するオブジェクトを追加.
+    # @param[in] objs --> オブジェクト名のリスト.
+    # @return 画像ファイルが見つかったオブジェクトの数.
+    #---------------------------------------.
+    def track(self, objs):
+        count = 0
+        for obj, file_node in zip(objs, getShadingResolver().fileNodes(objs)):
+            path = getTexturePath(file_node) if file_node else ''
+            if not path:
+                continue
+            self.untrack([obj])
+            self._fileNodes[obj] = (file_node, path)
+            self._objects.setdefault(path, []).append(obj)
+            if path not in self._stats:
+                self._stats[path] = _stat(path)
+            count += 1
+        return count
+
+    #---------------------------------------.
+    # 監視をやめる.
+    # @param[in] objs --> オブジェクト名のリスト. Noneの場合はすべて.
+    #---------------------------------------.
+    def untrack(self, objs=None):
+        if objs is None:
+            self._objects.clear()
+            self._fileNodes.clear()
+            self._stats.clear()
+            self._pending.clear()
+            return
+        for obj in objs:
+            if obj not in self._fileNodes:
+                continue
+            file_node, path = self._fileNodes.pop(obj)
+            self._objects[path].remove(obj)
+            if not self._objects[path]:
+                del self._objects[path]
+                self._stats.pop(path, None)
+                self._pending.pop(path, None)
+
+    #---------------------------------------.
+    # 監視している画像のパス.
+    #---------------------------------------.
+    def paths(self):
+        return list(self._objects)
+
+    #---------------------------------------.
+    # 画像ファイルを調べ、変更が落ち着いていれば平面を合わせ直す.
+    # @param[in] now --> 現在の時刻(秒). Noneの場合はtimeit.default_timer().
+    # @return 合わせ直したオブジェクトのリスト(何もしなかった場合は空).
+    #---------------------------------------.
+    def poll(self, now=None):
+        if now is None:
+            now = timeit.default_timer()
+        for path in self._objects:
+            stat = _stat(path)
+            if stat is None or stat == self._stats.get(path):
+                #消えたファイル(保存途中など)や変更のないファイル
+                continue
+            if self._pending.get(path) != stat:
+                self._pending[path] = stat
+                self._lastChange = now
+
+        if not self._pending or now - self._lastChange < self.settle:
+            return []
+        return self.flush()
+
+    #---------------------------------------.
+    # 変更された画像を使っているオブジェクトを合わせ直す(1回の取り消し単位).
+    # @return 合わせ直したオブジェクトのリスト.
+    #---------------------------------------.
+    def flush(self):
+        start = timeit.default_timer()
+        pending, self._pending = self._pending, {}
+        self._stats.update(pending)
+        objs = [obj for path in pending for obj in self._objects.get(path, []) if cmds.objExists(obj)]
+        if not objs:
+            return []
+        file_nodes = [self._fileNodes[obj][0] for obj in objs]
+
+        #変更された画像だけヘッダーを読み直す(getFileNodeSizesは索引で変更を確認する)
+        if self.use_uv_bounds:
+            file_sizes = getDisplayedSizes(objs, file_nodes)
+        else:
+            file_sizes = getFileNodeSizes(file_nodes)
+
+        boxes = getNodeBoundingBoxes(objs, exact=False).tolist()
+
+        scaled = []
+        cmds.undoInfo(openChunk=True)
+        try:
+            for obj, file_size, box in zip(objs, file_sizes, boxes):
+                if not file_size:
+                    continue
+                obj_size = (abs(box[3] - box[0]), abs(box[5] - box[2]))
+                if obj_size[0] <= 0.0 or obj_size[1] <= 0.0:
+                    continue
+                cmds.scale(file_size[0]/obj_size[0]*self.ratio, file_size[1]/obj_size[1]*self.ratio, obj, relative=True, xz=True)
+                scaled.append(obj)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        print('Rematched {0} planes for {1} changed textures in {2:.3f} sec.'.format(
+            len(scaled), len(pending), timeit.default_timer() - start))
+        return scaled
+
+    #---------------------------------------.
+    # 一定の間隔で調べ始める(Qtのタイマーを使う).
+    # @param[in] interval --> 調べる間隔(ミリ秒).
+    #---------------------------------------.
+    def start(self, interval=POLL_INTERVAL):
+        if QtCore is None:
+            raise RuntimeError('PySide2 is required to start the texture watcher.')
+        self.stop()
+        self._timer = QtCore.QTimer()
+        self._timer.timeout.connect(self.poll)
+        self._timer.start(interval)
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def isRunning(self):
+        return self._timer is not None
+
+_watcher = [None]
+
+#---------------------------------------.
+# 選択したオブジェクト(Noneの場合は選択)の画像ファイルの監視を始める.
+# @param[in] objs --> オブジェクト名のリスト.
+# @param[in] ratio --> match_sizeと同じ比率.
+# @param[in] use_uv_bounds --> Trueの場合はUVの範囲(アトラスの一部)に合わせる.
+# @return TextureWatcher.
+#---------------------------------------.
+def startWatching(objs=None, ratio=0.01, use_uv_bounds=False):
+    if objs is None:
+        objs = cmds.ls(selection=True, long=True)
+    stopWatching()
+    watcher = TextureWatcher(ratio=ratio, use_uv_bounds=use_uv_bounds)
+    watcher.track(objs)
+    watcher.start()
+    _watcher[0] = watcher
+    print('Watching {0} textures used by {1} planes.'.format(len(watcher.paths()), len(watcher)))
+    return watcher
+
+#---------------------------------------.
+# 監視をやめる.
+#---------------------------------------.
+def stopWatching():
+    if _watcher[0] is not None:
+        _watcher[0].stop()
+        _watcher[0] = None
@@ -3,76 +3,346 @@
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+from collections import OrderedDict
+import timeit
+
 import maya.cmds as mc
+import numpy as np
+
+from ..common.meshGeometry import (parseComponents, formatComponents, selectPolygons, connectedComponents,
+                                   getPolygons, getEdges, setPoints)
+from ..common.snapshotCache import getWorldPoints
+from ..common.pcaMath import principalAxes, getXYZFromRotateMatrix
 
+#---------------------------------------.
+# 座標の平均.
+# @param[in] posList --> 座標のリスト(N,3).
+# @return [x, y, z].
+#---------------------------------------.
 def calcCenter(posList):
-    ans = [0,0,0]
-    for pos in posList:
-        ans[0] += pos[0]
-        ans[1] += pos[1]
-        ans[2] += pos[2]
-    ans[0] /= len(posList)
-    ans[1] /= len(posList)
-    ans[2] /= len(posList)
-    return ans
+    return np.asarray(posList, dtype=np.float64).reshape(-1, 3).mean(axis=0).tolist()
 
+#---------------------------------------.
+# 座標を囲むバウンディングボックスの中心.
+# @param[in] posList --> 座標のリスト(N,3).
+# @return [x, y, z].
+#---------------------------------------.
 def calcCenterByBox(posList):
-    _min = [posList[0][0],posList[0][1],posList[0][2]]
-    _max = [posList[0][0],posList[0][1],posList[0][2]]
-    for pos in posList:
-        for i in range(3):
-            if pos[i] < _min[i]:
-                _min[i] = pos[i]
-            if pos[i] > _max[i]:
-                _max[i] = pos[i]
-    ans = [(_max[0]+_min[0])/2,(_max[1]+_min[1])/2,(_max[2]+_min[2])/2]
-    return ans
-
-def calcPivotCenterPoint():
-    _type = None
-    selections = mc.ls(long=True,selection=True)
+    pos = np.asarray(posList, dtype=np.float64).reshape(-1, 3)
+    return ((pos.min(axis=0) + pos.max(axis=0)) / 2.0).tolist()
+
+#---------------------------------------.
+# 選択している頂点・エッジ・フェースを、メッシュごとの重複のない頂点番号にまとめる.
+# polyListComponentConversionは 'pCube1.vtx[0:7]' のような範囲でまとめて返すので、コンポーネントごとに展開しない.
+# @param[in] selections --> コンポーネント名のリスト(Noneの場合は現在の選択).
+# @return OrderedDict {メッシュ名: 頂点番号の配列}. コンポーネントを選択していない場合はNone.
+#---------------------------------------.
+def getSelectedVertices(selections=None):
+    if selections is None:
+        selections = mc.ls(long=True, selection=True)
+    components = [name for name in selections or [] if ('.vtx[' in name) or ('.e[' in name) or ('.f[' in name)]
+    if not components:
+        return None
+    vertices = mc.polyListComponentConversion(components, toVertex=True) or []
+    return OrderedDict((node, indices) for (node, kind), indices in parseComponents(vertices).items())
+
+#---------------------------------------.
+# 選択している頂点・エッジ・フェースの頂点のワールド座標をまとめて取得(共有している頂点は1回だけ).
+# @param[in] selections --> コンポーネント名のリスト(Noneの場合は現在の選択).
+# @return 座標(N,3). コンポーネントを選択していない場合はNone.
+#---------------------------------------.
+def getSelectedPositions(selections=None):
+    vertices = getSelectedVertices(selections)
+    if not vertices:
+        return None
+    return np.concatenate([getWorldPoints(mesh)[indices] for mesh, indices in vertices.items()])
+
+#---------------------------------------.
+# 選択しているコンポーネントのピボットを計算.
+# @param[in] byBox --> Trueの場合はバウンディングボックスの中心、Falseの場合は頂点の平均.
+# @param[in] selections --> コンポーネント名のリスト(Noneの場合は現在の選択).
+# @return [x, y, z]. 選択が正しくない場合はNone.
+#---------------------------------------.
+def calcPivotCenterPoint(byBox=True, selections=None):
+    if selections is None:
+        selections = mc.ls(long=True, selection=True)
     if not len(selections):
         return
-    if ".vtx" in selections[0]:
-        _type = "vtx"
-        selections = mc.filterExpand(selections, selectionMask= 31)
-    elif ".e" in selections[0]:
-        _type = "edge"
-        selections = mc.filterExpand(selections, selectionMask= 32)
-    elif ".f" in selections[0]:
-        _type = "face"
-        selections = mc.filterExpand(selections, selectionMask= 34)
-    else:
+    posList = getSelectedPositions(selections)
+    if posList is None:
         print("You can select 'vtx', 'edge', 'face', only.")
         return None
-    posList = []
-    for name in selections:
-        if _type == "vtx":
-            pos = mc.xform(name,q=True,worldSpace=True,translation=True)
-            posList.append([pos[0],pos[1],pos[2]])
-        elif _type == "edge":
-            pos = mc.xform(name,q=True,worldSpace=True,translation=True)
-            posList.append([pos[0],pos[1],pos[2]])
-            posList.append([pos[3],pos[4],pos[5]])
-        elif _type == "face":
-            pos = mc.xform(name,q=True,worldSpace=True,translation=True)
-            posList.append([pos[0],pos[ 1],pos[ 2]])
-            posList.append([pos[3],pos[ 4],pos[ 5]])
-            posList.append([pos[6],pos[ 7],pos[ 8]])
-            posList.append([pos[9],pos[10],pos[11]])
-    result = calcCenterByBox(posList)
+    if byBox:
+        result = calcCenterByBox(posList)
+    else:
+        result = calcCenter(posList)
     print(result)
     
     return result
 
-def scaleFromPivot(x,y,z):
-    pivotPos = calcPivotCenterPoint()
+#---------------------------------------.
+# 選択しているコンポーネント(またはオブジェクト)を、辺でつながったまとまり(アイランド)に分ける.
+# フェースを選択しているメッシュは選択したフェースの辺、それ以外は両端の頂点を選択している辺でつながりを調べる.
+# オブジェクトを選択している場合はメッシュ全体をシェルに分ける.
+# @param[in] selections --> コンポーネント名またはオブジェクト名のリスト(Noneの場合は現在の選択).
+# @return [(メッシュ名, 頂点番号の配列(V,), アイランドの番号(V,))] メッシュごと. アイランドの番号はメッシュごとに0からの連番.
+#---------------------------------------.
+def getSelectedIslands(selections=None):
+    if selections is None:
+        selections = mc.ls(long=True, selection=True)
+    selections = selections or []
+
+    #メッシュ名 --> 頂点番号のリスト, フェース番号のリスト(Noneの場合はメッシュ全体)
+    vertices = OrderedDict()
+    faces = {}
+
+    def longName(node):
+        return (mc.ls(node, long=True) or [node])[0]
+
+    components = [name for name in selections if '.' in name]
+    for (node, kind), indices in parseComponents(components).items():
+        mesh = longName(node)
+        if kind == 'vtx':
+            vertices.setdefault(mesh, []).append(indices)
+        elif kind == 'f':
+            counts, connects = getPolygons(mesh)
+            vertices.setdefault(mesh, []).append(selectPolygons(counts, connects, indices)[1])
+            faces.setdefault(mesh, []).append(indices)
+
+    #エッジは頂点に変換(範囲でまとめて返る)
+    edges = [name for name in components if '.e[' in name]
+    if edges:
+        converted = mc.polyListComponentConversion(edges, toVertex=True) or []
+        for (node, kind), indices in parseComponents(converted).items():
+            vertices.setdefault(longName(node), []).append(indices)
+
+    objects = [name for name in selections if '.' not in name]
+    if objects:
+        shapes = mc.listRelatives(objects, shapes=True, type='mesh', noIntermediate=True, fullPath=True) or []
+        for mesh in mc.listRelatives(shapes, parent=True, fullPath=True) or []:
+            vertices[mesh] = [np.arange(len(getWorldPoints(mesh)))]
+            faces[mesh] = None
+
+    islands = []
+    for mesh, indices in vertices.items():
+        indices = np.unique(np.concatenate(indices))
+        if mesh in faces:
+            mesh_faces = faces[mesh]
+            edges = getEdges(mesh, None if mesh_faces is None else np.concatenate(mesh_faces))
+        else:
+            edges = getEdges(mesh)
+            edges = edges[np.isin(edges, indices).all(axis=1)]
+        #頂点番号を選択頂点の中での位置に置き換えてラベル付け
+        local = np.searchsorted(indices, edges)
+        islands.append((mesh, indices, connectedComponents(len(indices), local)))
+    return islands
+
+#---------------------------------------.
+# アイランドごとのピボットをまとめて計算.
+# @param[in] positions --> 座標(N,3).
+# @param[in] labels --> 各座標のアイランドの番号(N,). 0からの連番.
+# @param[in] byBox --> Trueの場合はバウンディングボックスの中心、Falseの場合は頂点の平均.
+# @return ピボット(アイランド数,3).
+#---------------------------------------.
+def calcIslandCenters(positions, labels, byBox=True):
+    order = np.argsort(labels, kind='stable')
+    positions, labels = positions[order], labels[order]
+    starts = np.flatnonzero(np.concatenate([[True], labels[1:] != labels[:-1]]))
+    if byBox:
+        return (np.minimum.reduceat(positions, starts) + np.maximum.reduceat(positions, starts)) / 2.0
+    return np.add.reduceat(positions, starts) / np.diff(np.append(starts, len(labels)))[:, np.newaxis]
+
+#---------------------------------------.
+# まとまりごとの有向バウンディングボックス(OBB)をまとめて計算.
+# 主成分分析の軸に沿った箱を使う.
+# @param[in] positions --> 座標(N,3). 重複のない頂点の座標.
+# @param[in] labels --> 各座標のまとまりの番号(N,). 0からの連番.
+# @return (箱の中心(K,3), 箱の軸(K,3,3) 行が軸).
+#---------------------------------------.
+def calcOrientedBoxes(positions, labels):
+    order = np.argsort(labels, kind='stable')
+    positions, labels = positions[order], labels[order]
+    starts = np.flatnonzero(np.concatenate([[True], labels[1:] != labels[:-1]]))
+    centroids, axes = principalAxes(positions, np.diff(np.append(starts, len(labels))))
+
+    #各軸への投影の範囲から箱の中心を求める
+    local = np.einsum('nj,nkj->nk', positions - centroids[labels], axes[labels])
+    middle = (np.minimum.reduceat(local, starts) + np.maximum.reduceat(local, starts)) / 2.0
+    return (centroids + np.einsum('kj,kji->ki', middle, axes), axes)
+
+#---------------------------------------.
+# 選択を頂点のまとまりに分ける.
+# @param[in] perIsland --> Trueの場合はアイランドごと、Falseの場合は選択全体を1つのまとまりにする.
+# @param[in] selections --> コンポーネント名(またはオブジェクト名)のリスト(Noneの場合は現在の選択).
+# @return getSelectedIslandsと同じ形式.
+#---------------------------------------.
+def getSelectedGroups(perIsland=False, selections=None):
+    if perIsland:
+        return getSelectedIslands(selections)
+    vertices = getSelectedVertices(selections) or {}
+    return [(mesh, indices, np.zeros(len(indices), dtype=np.int64)) for mesh, indices in vertices.items()]
+
+#---------------------------------------.
+# アイランドの番号を全メッシュで通し番号にして、ピボットと軸をまとめて計算.
+# @param[in] islands --> getSelectedIslandsの戻り値.
+# @param[in] byBox --> Trueの場合はバウンディングボックスの中心、Falseの場合は頂点の平均.
+# @param[in] oriented --> Trueの場合は有向バウンディングボックスの中心と軸(byBoxは使わない).
+# @return (アイランドの番号を通し番号にしたislands, ピボット(アイランド数,3), 軸(アイランド数,3,3) orientedでない場合はNone).
+#---------------------------------------.
+def calcGroupCenters(islands, byBox=True, oriented=False):
+    if not islands:
+        return ([], np.zeros((0, 3)), None)
+    offsets = np.cumsum([0] + [labels.max() + 1 if len(labels) else 0 for mesh, indices, labels in islands])
+    islands = [(mesh, indices, labels + offset) for (mesh, indices, labels), offset in zip(islands, offsets)]
+    positions = np.concatenate([getWorldPoints(mesh)[indices] for mesh, indices, labels in islands])
+    labels = np.concatenate([labels for mesh, indices, labels in islands])
+    if oriented:
+        centers, axes = calcOrientedBoxes(positions, labels)
+        return (islands, centers, axes)
+    return (islands, calcIslandCenters(positions, labels, byBox), None)
+
+#---------------------------------------.
+# 頂点のまとまりを、それぞれのピボットを中心にスケールする(undoは1回にまとめる).
+# 同じピボットの頂点は複数メッシュでも1回のscaleで行う.
+# @param[in] x, y, z --> 倍率.
+# @param[in] islands --> calcGroupCentersの戻り値のislands.
+# @param[in] centers --> ピボット(K,3).
+# @param[in] axes --> スケールする軸(K,3,3). Noneの場合はワールド軸.
+#---------------------------------------.
+def scaleGroups(x, y, z, islands, centers, axes=None):
+    components = [[] for _ in range(len(centers))]
+    for mesh, indices, labels in islands:
+        order = np.argsort(labels, kind='stable')
+        sorted_labels = labels[order]
+        splits = np.flatnonzero(np.diff(sorted_labels)) + 1
+        for label, group in zip(sorted_labels[np.append(0, splits)].tolist(), np.split(indices[order], splits)):
+            components[label] += formatComponents(mesh, 'vtx', group)
+
+    #軸はscaleのorientAxes(回転順序xyzの角度. 現在の角度の単位)で渡す
+    orients = [None] * len(centers)
+    if axes is not None:
+        angles = np.column_stack(getXYZFromRotateMatrix(axes))
+        if mc.currentUnit(query=True, angle=True) != 'rad':
+            angles = np.degrees(angles)
+        orients = angles.tolist()
+
+    mc.undoInfo(openChunk=True)
+    try:
+        for group, center, orient in zip(components, np.asarray(centers).tolist(), orients):
+            if not group:
+                continue
+            if orient is None:
+                mc.scale(x, y, z, group, pivot=center, relative=True)
+            else:
+                mc.scale(x, y, z, group, pivot=center, orientAxes=orient, relative=True)
+    finally:
+        mc.undoInfo(closeChunk=True)
+
+#---------------------------------------.
+# 選択をピボットを中心にスケールする(undoは1回にまとめる).
+# @param[in] x, y, z --> 倍率.
+# @param[in] byBox --> Trueの場合はバウンディングボックスの中心、Falseの場合は頂点の平均をピボットにする.
+# @param[in] perIsland --> Trueの場合はアイランドごとのピボットでスケールする.
+# @param[in] oriented --> Trueの場合は有向バウンディングボックスの中心を軸に、箱の軸に沿ってスケールする.
+# @param[in] selections --> コンポーネント名(またはオブジェクト名)のリスト(Noneの場合は現在の選択).
+# @return スケールしたまとまりの数.
+#---------------------------------------.
+def scaleSelection(x, y, z, byBox=True, perIsland=False, oriented=False, selections=None):
+    start = timeit.default_timer()
+    islands = getSelectedGroups(perIsland, selections)
+    if not islands:
+        if perIsland:
+            print("You can select 'vtx', 'edge', 'face' or mesh objects, only.")
+        else:
+            print("You can select 'vtx', 'edge', 'face', only.")
+        return 0
+
+    islands, centers, axes = calcGroupCenters(islands, byBox, oriented)
+    scaleGroups(x, y, z, islands, centers, axes)
+
+    elapsed = timeit.default_timer() - start
+    print('Scaled {0} {1} in {2:.3f} sec.'.format(len(centers), 'islands' if perIsland else 'selections', elapsed))
+    return len(centers)
+
+#---------------------------------------.
+# 選択しているアイランド(シェル)を、それぞれのピボットを中心にスケールする(undoは1回にまとめる).
+# @param[in] x, y, z --> 倍率.
+# @param[in] byBox --> Trueの場合はバウンディングボックスの中心、Falseの場合は頂点の平均をピボットにする.
+# @param[in] selections --> コンポーネント名またはオブジェクト名のリスト(Noneの場合は現在の選択).
+# @param[in] oriented --> Trueの場合はアイランドごとの有向バウンディングボックスの軸に沿ってスケールする.
+# @return スケールしたアイランドの数.
+#---------------------------------------.
+def scaleIslandsFromPivot(x, y, z, byBox=True, selections=None, oriented=False):
+    return scaleSelection(x, y, z, byBox=byBox, perIsland=True, oriented=oriented, selections=selections)
+
+#---------------------------------------.
+# スケールのプレビュー.
+# 作成時に選択からピボットと元の頂点座標を一度だけ取得し、apply()では元の座標から計算した座標をメッシュごとにまとめて設定する.
+# プレビュー中の変更はundoに記録されない. commit()で元に戻してから、undoできるscaleを1回で行う.
+# @param[in] byBox --> Trueの場合はバウンディングボックスの中心、Falseの場合は頂点の平均をピボットにする.
+# @param[in] perIsland --> Trueの場合はアイランドごとのピボットでスケールする.
+# @param[in] oriented --> Trueの場合は有向バウンディングボックスの軸に沿ってスケールする.
+# @param[in] selections --> コンポーネント名(またはオブジェクト名)のリスト(Noneの場合は現在の選択).
+#---------------------------------------.
+class ScalePreview(object):
+    def __init__(self, byBox=True, perIsland=False, oriented=False, selections=None):
+        islands = getSelectedGroups(perIsland, selections)
+        self.islands, self.centers, self.axes = calcGroupCenters(islands, byBox, oriented)
+        if self.axes is None:
+            self.axes = np.broadcast_to(np.eye(3), (len(self.centers), 3, 3))
+        self.oriented = oriented
+        self.originals = [np.array(getWorldPoints(mesh)) for mesh, indices, labels in self.islands]
+        self.scale = (1.0, 1.0, 1.0)
+
+    def isValid(self):
+        return bool(self.islands)
+
+    #---------------------------------------.
+    # 元の座標を倍率でスケールした座標を設定.
+    # @param[in] x, y, z --> 倍率.
+    #---------------------------------------.
+    def apply(self, x, y, z):
+        scale = np.array([x, y, z], dtype=np.float64)
+        for (mesh, indices, labels), original in zip(self.islands, self.originals):
+            points = original.copy()
+            pivots, axes = self.centers[labels], self.axes[labels]
+            #箱の軸の座標系でスケールしてワールドに戻す
+            local = np.einsum('nj,nkj->nk', original[indices] - pivots, axes) * scale
+            points[indices] = pivots + np.einsum('nk,nkj->nj', local, axes)
+            setPoints(mesh, points)
+        self.scale = (x, y, z)
+
+    #---------------------------------------.
+    # 元の座標に戻す.
+    #---------------------------------------.
+    def restore(self):
+        if self.scale == (1.0, 1.0, 1.0):
+            return
+        for (mesh, indices, labels), original in zip(self.islands, self.originals):
+            setPoints(mesh, original)
+        self.scale = (1.0, 1.0, 1.0)
+
+    #---------------------------------------.
+    # 元に戻してから、undoできるscaleで確定する.
+    # @param[in] x, y, z --> 倍率.
+    #---------------------------------------.
+    def commit(self, x, y, z):
+        self.restore()
+        if self.isValid():
+            scaleGroups(x, y, z, self.islands, self.centers, self.axes if self.oriented else None)
+
+def scaleFromPivot(x,y,z,perIsland=False,byBox=True,oriented=False):
+    if perIsland or oriented:
+        if (x, y, z) != (1.0, 1.0, 1.0):
+            scaleSelection(x,y,z,byBox=byBox,perIsland=perIsland,oriented=oriented)
+        return
+    pivotPos = calcPivotCenterPoint(byBox=byBox)
     if pivotPos == None:
         return
-    elif not (x*y*z) == 1.00:
+    elif (x, y, z) != (1.0, 1.0, 1.0):
         mc.undoInfo(openChunk=True)
         mc.scale(x,y,z,pivot=pivotPos,relative=True)
         mc.undoInfo(closeChunk=True)
 
-def relativeScaleByPivot(x,y,z):
-    scaleFromPivot(x,y,z)
\ No newline at end of file
+def relativeScaleByPivot(x,y,z,perIsland=False,oriented=False):
+    scaleFromPivot(x,y,z,perIsland=perIsland,oriented=oriented)
\ No newline at end of file
@@ -10,6 +10,8 @@ from maya import cmds as mc
 from maya.app.general.mayaMixin import MayaQWidgetBaseMixin
 from PySide2 import QtCore, QtWidgets, QtUiTools
 
+from .relativeScaleByPivot import calcCenter, calcCenterByBox, calcPivotCenterPoint, scaleSelection, ScalePreview
+
 
 def this_dir(*args):
     """このスクリプトと同じフォルダからの相対パスをフルパスに変換して返す"""
@@ -19,6 +21,12 @@ def this_dir(*args):
 
 class CreatePolygonUI(MayaQWidgetBaseMixin, QtWidgets.QWidget):
     isCalcCenterByBox = True
+    isPerIsland = False
+    isOrientedBox = False
+    #プレビュー(ScalePreview). プレビューしていない場合はNone
+    preview = None
+    #スピンボックスの変更をまとめてプレビューに反映する間隔(ミリ秒)
+    PREVIEW_INTERVAL = 30
     x_value = 1
     y_value = 1
     z_value = 1
@@ -51,8 +59,21 @@ class CreatePolygonUI(MayaQWidgetBaseMixin, QtWidgets.QWidget):
         self.ui.doubleSpinBox_Y.editingFinished.connect(self.reloadValue)
         self.ui.doubleSpinBox_Z.editingFinished.connect(self.reloadValue)
         self.ui.isCalcCenterByBox.stateChanged.connect(self.reloadIsCalcCenterByBox)
+        self.ui.isPerIsland.stateChanged.connect(self.reloadIsPerIsland)
+        self.ui.isOrientedBox.stateChanged.connect(self.reloadIsOrientedBox)
+        self.ui.isLivePreview.stateChanged.connect(self.reloadIsLivePreview)
         self.ui.scaleButton.clicked.connect(self.scaleFromPivot)
 
+        # プレビューの更新(PREVIEW_INTERVALごとに最大1回、その時点の最新の値を反映する)
+        self.selectionJob = None
+        self.previewTimer = QtCore.QTimer(self)
+        self.previewTimer.setSingleShot(True)
+        self.previewTimer.setInterval(self.PREVIEW_INTERVAL)
+        self.previewTimer.timeout.connect(self.updatePreview)
+        self.ui.doubleSpinBox_X.valueChanged.connect(self.requestPreview)
+        self.ui.doubleSpinBox_Y.valueChanged.connect(self.requestPreview)
+        self.ui.doubleSpinBox_Z.valueChanged.connect(self.requestPreview)
+
     def initUI(self, ui_filename):
         ui_loader = QtUiTools.QUiLoader()        
         ui_file = QtCore.QFile(ui_filename)        
@@ -71,71 +92,91 @@ class CreatePolygonUI(MayaQWidgetBaseMixin, QtWidgets.QWidget):
             self.isCalcCenterByBox = True
         else:
             self.isCalcCenterByBox = False
+        if self.preview is not None:
+            self.capturePreview()
+    
+    def reloadIsPerIsland(self):
+        self.isPerIsland = self.ui.isPerIsland.isChecked()
+        if self.preview is not None:
+            self.capturePreview()
+
+    def reloadIsOrientedBox(self):
+        self.isOrientedBox = self.ui.isOrientedBox.isChecked()
+        if self.preview is not None:
+            self.capturePreview()
+
+    def reloadIsLivePreview(self):
+        if self.ui.isLivePreview.isChecked():
+            # 選択が変わるたびにピボットと元の座標を取り直す
+            self.selectionJob = mc.scriptJob(event=['SelectionChanged', self.capturePreview])
+            self.capturePreview()
+        else:
+            self.stopPreview()
+
+    def capturePreview(self):
+        # 確定していないプレビューは元に戻す
+        if self.preview is not None:
+            self.preview.restore()
+        self.preview = ScalePreview(byBox=self.isCalcCenterByBox, perIsland=self.isPerIsland, oriented=self.isOrientedBox)
+        self.requestPreview()
+
+    def stopPreview(self):
+        self.previewTimer.stop()
+        if self.selectionJob is not None and mc.scriptJob(exists=self.selectionJob):
+            mc.scriptJob(kill=self.selectionJob, force=True)
+        self.selectionJob = None
+        if self.preview is not None:
+            self.preview.restore()
+        self.preview = None
+
+    def requestPreview(self, *args):
+        #ドラッグ中に止まらないよう、タイマーが動いている間は再スタートしない(間引き)
+        if self.preview is not None and not self.previewTimer.isActive():
+            self.previewTimer.start()
+
+    def updatePreview(self):
+        self.x_value = self.ui.doubleSpinBox_X.value()
+        self.y_value = self.ui.doubleSpinBox_Y.value()
+        self.z_value = self.ui.doubleSpinBox_Z.value()
+        if self.preview is not None and self.preview.isValid():
+            self.preview.apply(self.x_value, self.y_value, self.z_value)
+
+    def commitPreview(self):
+        self.previewTimer.stop()
+        self.updatePreview()
+        if (self.x_value, self.y_value, self.z_value) != (1.0, 1.0, 1.0):
+            self.preview.commit(self.x_value, self.y_value, self.z_value)
+
+        # 確定した形状から続けてプレビューできるように倍率を1に戻す
+        for spinBox in (self.ui.doubleSpinBox_X, self.ui.doubleSpinBox_Y, self.ui.doubleSpinBox_Z):
+            spinBox.blockSignals(True)
+            spinBox.setValue(1.0)
+            spinBox.blockSignals(False)
+        self.reloadValue()
+        self.capturePreview()
+
+    def closeEvent(self, event):
+        self.stopPreview()
+        super(CreatePolygonUI, self).closeEvent(event)
     
     def calcCenter(self,posList):
-        ans = [0,0,0]
-        for pos in posList:
-            ans[0] += pos[0]
-            ans[1] += pos[1]
-            ans[2] += pos[2]
-        ans[0] /= len(posList)
-        ans[1] /= len(posList)
-        ans[2] /= len(posList)
-        return ans
+        return calcCenter(posList)
     
     def calcCenterByBox(self,posList):
-        _min = [posList[0][0],posList[0][1],posList[0][2]]
-        _max = [posList[0][0],posList[0][1],posList[0][2]]
-        for pos in posList:
-            for i in range(3):
-                if pos[i] < _min[i]:
-                    _min[i] = pos[i]
-                if pos[i] > _max[i]:
-                    _max[i] = pos[i]
-        ans = [(_max[0]+_min[0])/2,(_max[1]+_min[1])/2,(_max[2]+_min[2])/2]
-        return ans
+        return calcCenterByBox(posList)
 
     def calcPivotCenterPoint(self):
-        selections = mc.ls(long=True,selection=True)
-        if not len(selections):
-            return
-        if ".vtx" in selections[0]:
-            _type = "vtx"
-            selections = mc.filterExpand(selections, selectionMask= 31)
-        elif ".e" in selections[0]:
-            _type = "edge"
-            selections = mc.filterExpand(selections, selectionMask= 32)
-        elif ".f" in selections[0]:
-            _type = "face"
-            selections = mc.filterExpand(selections, selectionMask= 34)
-        else:
-            print("You can select 'vtx', 'edge', 'face', only.")
-            return None
-        posList = []
-        for name in selections:
-            if _type == "vtx":
-                pos = mc.xform(name,q=True,worldSpace=True,translation=True)
-                posList.append([pos[0],pos[1],pos[2]])
-            elif _type == "edge":
-                pos = mc.xform(name,q=True,worldSpace=True,translation=True)
-                posList.append([pos[0],pos[1],pos[2]])
-                posList.append([pos[3],pos[4],pos[5]])
-            elif _type == "face":
-                pos = mc.xform(name,q=True,worldSpace=True,translation=True)
-                posList.append([pos[0],pos[ 1],pos[ 2]])
-                posList.append([pos[3],pos[ 4],pos[ 5]])
-                posList.append([pos[6],pos[ 7],pos[ 8]])
-                posList.append([pos[9],pos[10],pos[11]])
-        if self.isCalcCenterByBox:
-            result = self.calcCenterByBox(posList)
-        else:
-            result = self.calcCenter(posList)
-        
-        print(result)
-        
-        return result
+        return calcPivotCenterPoint(byBox=self.isCalcCenterByBox)
 
     def scaleFromPivot(self):
+        if self.preview is not None:
+            self.commitPreview()
+            return
+        if self.isPerIsland or self.isOrientedBox:
+            if not (self.x_value*self.y_value*self.z_value) == 1.00:
+                scaleSelection(self.x_value,self.y_value,self.z_value,byBox=self.isCalcCenterByBox,
+                               perIsland=self.isPerIsland,oriented=self.isOrientedBox)
+            return
         pivotPos = self.calcPivotCenterPoint()
         if pivotPos == None:
             return
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+from .vecMath import as_array, cross_vec3, dot_vec3, normalize_vec3
+
+#葉1つに入れる三角形の数
+LEAF_SIZE = 8
+#一度に探索するレイの数(探索中の(レイ, ノード)の組の数を抑える)
+RAY_CHUNK = 1024
+
+#---------------------------------------.
+# 座標をモートン符号(xyzのビットを交互に並べた値)に変換.
+# @param[in] points --> 座標(N,3).
+# @param[in] lo --> 全体の最小値(3,).
+# @param[in] hi --> 全体の最大値(3,).
+# @return 30bitのモートン符号(N,).
+#---------------------------------------.
+def mortonCodes(points, lo, hi):
+    scale = np.where(hi - lo > 0, hi - lo, 1.0)
+    q = np.clip(((points - lo) / scale * 1023.0).astype(np.uint64), 0, 1023)
+
+    def spread(v):
+        v = (v | (v << np.uint64(16))) & np.uint64(0x030000FF)
+        v = (v | (v << np.uint64(8))) & np.uint64(0x0300F00F)
+        v = (v | (v << np.uint64(4))) & np.uint64(0x030C30C3)
+        v = (v | (v << np.uint64(2))) & np.uint64(0x09249249)
+        return v
+
+    return (spread(q[:, 0]) << np.uint64(2)) | (spread(q[:, 1]) << np.uint64(1)) | spread(q[:, 2])
+
+#---------------------------------------.
+# 三角形メッシュのバウンディングボリューム階層(BVH).
+# 三角形をモートン符号順に並べてLEAF_SIZE個ずつ葉にし、葉の上に完全二分木を作る.
+# ノードiの子は 2i+1, 2i+2 (ヒープと同じ並び)なので構築も探索も階層ごとにまとめて計算できる.
+#---------------------------------------.
+class BVH(object):
+    def __init__(self, points, triangles, leafSize=LEAF_SIZE):
+        points = as_array(points)
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        tri = points[triangles]
+        tri_lo = tri.min(axis=1)
+        tri_hi = tri.max(axis=1)
+
+        #三角形を重心のモートン符号順に並べる
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        self.order = np.argsort(mortonCodes(tri.mean(axis=1), lo, hi), kind='stable')
+        tri, tri_lo, tri_hi = tri[self.order], tri_lo[self.order], tri_hi[self.order]
+
+        #Möller-Trumboreの交差判定用に 頂点0 と 辺 を保持
+        self.v0 = tri[:, 0]
+        self.e1 = tri[:, 1] - tri[:, 0]
+        self.e2 = tri[:, 2] - tri[:, 0]
+        self.normals = normalize_vec3(cross_vec3(self.e1, self.e2))
+        self.count = len(tri)
+        self.leafSize = leafSize
+
+        #葉の数を2のべき乗にそろえる(余った葉は空の箱)
+        leaves = max(1, -(-self.count // leafSize))
+        self.depth = int(np.ceil(np.log2(leaves))) if leaves > 1 else 0
+        self.leafBase = (1 << self.depth) - 1
+        nodes = 2 * (1 << self.depth) - 1
+        self.lo = np.full((nodes, 3), np.inf)
+        self.hi = np.full((nodes, 3), -np.inf)
+
+        #葉の箱
+        if self.count:
+            starts = np.arange(0, self.count, leafSize)
+            self.lo[self.leafBase:self.leafBase + len(starts)] = np.minimum.reduceat(tri_lo, starts, axis=0)
+            self.hi[self.leafBase:self.leafBase + len(starts)] = np.maximum.reduceat(tri_hi, starts, axis=0)
+
+        #下の階層から親の箱をまとめて計算
+        for level in range(self.depth - 1, -1, -1):
+            first = (1 << level) - 1
+            parents = np.arange(first, 2 * first + 1)
+            self.lo[parents] = np.minimum(self.lo[2 * parents + 1], self.lo[2 * parents + 2])
+            self.hi[parents] = np.maximum(self.hi[2 * parents + 1], self.hi[2 * parents + 2])
+
+    #---------------------------------------.
+    # 全体のバウンディングボックス.
+    # @return (最小値(3,), 最大値(3,)).
+    #---------------------------------------.
+    def bounds(self):
+        return (self.lo[0], self.hi[0])
+
+    #---------------------------------------.
+    # 三角形の元のインデックス(コンストラクタに渡したtrianglesの行番号)を取得.
+    # @param[in] index --> intersectが返した三角形の番号.
+    # @return 元のインデックス.
+    #---------------------------------------.
+    def triangleIndex(self, index):
+        return self.order[index]
+
+    #---------------------------------------.
+    # レイと箱の交差判定(スラブ法). 方向が0の軸はnanになるので判定から外す.
+    # 余った葉(最小値inf, 最大値-inf)とそれだけを持つノードはどのレイにも当たらない.
+    #---------------------------------------.
+    def _hitBoxes(self, origins, inv_dirs, nodes, tmax):
+        lo, hi = self.lo[nodes], self.hi[nodes]
+        with np.errstate(invalid='ignore'):
+            t1 = (lo - origins) * inv_dirs
+            t2 = (hi - origins) * inv_dirs
+            tnear = np.fmax.reduce(np.fmin(t1, t2), axis=1)
+            tfar = np.fmin.reduce(np.fmax(t1, t2), axis=1)
+        return (lo[:, 0] <= hi[:, 0]) & (tnear <= tfar) & (tfar >= 0.0) & (tnear <= tmax)
+
+    #---------------------------------------.
+    # レイと三角形の交差判定(Möller-Trumbore). 組ごとにまとめて計算.
+    # @return 交差点までの距離(交差しない場合はinf).
+    #---------------------------------------.
+    def _hitTriangles(self, origins, directions, tris):
+        e1, e2 = self.e1[tris], self.e2[tris]
+        p = cross_vec3(directions, e2)
+        det = dot_vec3(e1, p)
+        valid = np.abs(det) > 1e-12
+        inv_det = 1.0 / np.where(valid, det, 1.0)
+        s = origins - self.v0[tris]
+        u = dot_vec3(s, p) * inv_det
+        q = cross_vec3(s, e1)
+        v = dot_vec3(directions, q) * inv_det
+        t = dot_vec3(e2, q) * inv_det
+        valid &= (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t >= 0.0)
+        return np.where(valid, t, np.inf)
+
+    #---------------------------------------.
+    # 複数のレイの最も近い交差点をまとめて求める.
+    # @param[in] origins --> レイの始点(R,3).
+    # @param[in] directions --> レイの方向(R,3)または全レイ共通の方向(3,).
+    # @param[in] tmax --> 探索する最大距離.
+    # @return (距離(R,) 交差しない場合はinf, 三角形の番号(R,) 交差しない場合は-1).
+    #---------------------------------------.
+    def intersect(self, origins, directions, tmax=np.inf):
+        origins = as_array(origins).reshape(-1, 3)
+        directions = np.broadcast_to(as_array(directions), origins.shape)
+        best_t = np.full(len(origins), np.inf)
+        best_tri = np.full(len(origins), -1, dtype=np.int64)
+        if not self.count:
+            return (best_t, best_tri)
+
+        with np.errstate(divide='ignore'):
+            inv_dirs = 1.0 / directions
+
+        for start in range(0, len(origins), RAY_CHUNK):
+            rays = np.arange(start, min(start + RAY_CHUNK, len(origins)))
+            nodes = np.zeros(len(rays), dtype=np.int64)
+
+            #根から葉まで階層ごとに、箱に当たった(レイ, ノード)の組だけを子へ進める
+            for level in range(self.depth + 1):
+                hit = self._hitBoxes(origins[rays], inv_dirs[rays], nodes, tmax)
+                rays, nodes = rays[hit], nodes[hit]
+                if level < self.depth:
+                    rays = np.repeat(rays, 2)
+                    nodes = (2 * nodes[:, np.newaxis] + np.array([1, 2])).reshape(-1)
+                if not len(rays):
+                    break
+            if not len(rays):
+                continue
+
+            #葉の中の三角形と交差判定
+            tris = ((nodes - self.leafBase) * self.leafSize)[:, np.newaxis] + np.arange(self.leafSize)
+            rays = np.repeat(rays, self.leafSize)
+            tris = tris.reshape(-1)
+            inside = tris < self.count
+            rays, tris = rays[inside], tris[inside]
+            t = self._hitTriangles(origins[rays], directions[rays], tris)
+            t[t > tmax] = np.inf
+
+            #レイごとに最も近い交差点を残す
+            np.minimum.at(best_t, rays, t)
+            closest = np.isfinite(t) & (t == best_t[rays])
+            best_tri[rays[closest]] = tris[closest]
+
+        return (best_t, best_tri)
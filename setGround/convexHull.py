@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+from .vecMath import as_array, cross_vec3, dot_vec3, length_vec3, normalize_vec3
+
+#凸包を計算する頂点数の上限. これより多い場合は方向サンプリングで頂点を間引く
+REDUCE_THRESHOLD = 4096
+#間引きに使う方向の数(各方向で最も外側にある頂点だけを残す)
+REDUCE_DIRECTIONS = 256
+#方向サンプリングで一度に処理する頂点数(CHUNK x REDUCE_DIRECTIONS x 4byte がキャッシュに収まる大きさ)
+REDUCE_CHUNK = 4096
+
+#---------------------------------------.
+# 球面上にほぼ均等に並んだ方向ベクトルを作成(フィボナッチ球面).
+# @param[in] count --> 方向の数.
+# @return 単位ベクトル(count,3).
+#---------------------------------------.
+def fibonacciDirections(count):
+    i = np.arange(count) + 0.5
+    phi = np.arccos(1.0 - 2.0 * i / count)
+    theta = np.pi * (1.0 + 5.0 ** 0.5) * i
+    return np.stack([np.cos(theta) * np.sin(phi), np.sin(theta) * np.sin(phi), np.cos(phi)], axis=-1)
+
+#---------------------------------------.
+# 各方向で最も外側にある頂点(=凸包の頂点)のインデックスを取得.
+# @param[in] points --> 座標(N,3).
+# @param[in] directions --> 方向ベクトル(K,3).
+# @return 重複を除いた頂点インデックス.
+#---------------------------------------.
+def supportIndices(points, directions):
+    points = as_array(points)
+    directions = np.asarray(directions, dtype=np.float32)
+    center = points.mean(axis=0)
+    best = np.full(len(directions), -np.inf, dtype=np.float32)
+    best_index = np.zeros(len(directions), dtype=np.int64)
+    for start in range(0, len(points), REDUCE_CHUNK):
+        chunk = (points[start:start + REDUCE_CHUNK] - center).astype(np.float32)
+        proj = directions.dot(chunk.T)
+        arg = proj.argmax(axis=1)
+        value = proj[np.arange(len(directions)), arg]
+        update = value > best
+        best[update] = value[update]
+        best_index[update] = arg[update] + start
+    return np.unique(best_index)
+
+#---------------------------------------.
+# 初期の四面体を作る4頂点を選ぶ.
+# @param[in] points --> 座標(N,3).
+# @param[in] eps --> 許容誤差.
+# @return 頂点インデックス4つ. 全頂点が同一平面上にある場合はNone.
+#---------------------------------------.
+def _initialSimplex(points, eps):
+    i0 = int(points[:, 0].argmin())
+    i1 = int(length_vec3(points - points[i0]).argmax())
+    line = points[i1] - points[i0]
+    if length_vec3(line) <= eps:
+        return None
+    i2 = int(length_vec3(cross_vec3(points - points[i0], line)).argmax())
+    normal = cross_vec3(line, points[i2] - points[i0])
+    if length_vec3(normal) <= eps * length_vec3(line):
+        return None
+    normal = normalize_vec3(normal)
+    dist = (points - points[i0]).dot(normal)
+    i3 = int(np.abs(dist).argmax())
+    if abs(dist[i3]) <= eps:
+        return None
+    return [i0, i1, i2, i3]
+
+#---------------------------------------.
+# 3次元の凸包を計算(Quickhull). 外側の頂点の割り当てはまとめて計算する.
+# @param[in] points --> 座標(N,3).
+# @return 三角形の頂点インデックス(F,3). 法線が外向きになる順番.
+#         全頂点が同一平面上にある場合はValueError.
+#---------------------------------------.
+def quickHull(points):
+    points = as_array(points)
+    extent = np.ptp(points, axis=0).max() if len(points) else 0.0
+    eps = max(extent, 1.0) * 1e-9
+
+    simplex = _initialSimplex(points, eps)
+    if simplex is None:
+        raise ValueError('points are coplanar.')
+    center = points[simplex].mean(axis=0)
+
+    #face_id --> [頂点(a,b,c), 法線, オフセット, 外側の頂点インデックス]
+    faces = {}
+    #有向エッジ(a,b) --> face_id
+    edges = {}
+    next_id = [0]
+
+    def addFace(a, b, c):
+        normal = normalize_vec3(cross_vec3(points[b] - points[a], points[c] - points[a]))
+        face_id = next_id[0]
+        next_id[0] += 1
+        faces[face_id] = [(a, b, c), normal, normal.dot(points[a]), None]
+        edges[(a, b)] = face_id
+        edges[(b, c)] = face_id
+        edges[(c, a)] = face_id
+        return face_id
+
+    def assignOutside(face_ids, candidates):
+        #各頂点を最も遠い面に割り当てる(どの面の外側にもない頂点は捨てる)
+        normals = np.array([faces[f][1] for f in face_ids])
+        offsets = np.array([faces[f][2] for f in face_ids])
+        if len(candidates):
+            dist = points[candidates].dot(normals.T) - offsets
+            best = dist.argmax(axis=1)
+            outside = dist[np.arange(len(candidates)), best] > eps
+        for k, f in enumerate(face_ids):
+            if len(candidates):
+                faces[f][3] = candidates[outside & (best == k)]
+            else:
+                faces[f][3] = candidates
+
+    #初期の四面体(法線が重心の反対側を向くように並べる)
+    i0, i1, i2, i3 = simplex
+    initial = []
+    for a, b, c in ((i0, i1, i2), (i0, i2, i3), (i0, i3, i1), (i1, i3, i2)):
+        normal = cross_vec3(points[b] - points[a], points[c] - points[a])
+        if normal.dot(points[a] - center) < 0:
+            b, c = c, b
+        initial.append(addFace(a, b, c))
+    others = np.setdiff1d(np.arange(len(points)), simplex)
+    assignOutside(initial, others)
+
+    stack = [f for f in initial if len(faces[f][3])]
+    while stack:
+        face_id = stack.pop()
+        if face_id not in faces or not len(faces[face_id][3]):
+            continue
+        verts, normal, offset, outside = faces[face_id]
+        apex = int(outside[(points[outside].dot(normal) - offset).argmax()])
+        apex_pos = points[apex]
+
+        #apexから見える面を隣接面をたどって集める
+        visible = set([face_id])
+        queue = [face_id]
+        while queue:
+            f = queue.pop()
+            a, b, c = faces[f][0]
+            for u, v in ((a, b), (b, c), (c, a)):
+                g = edges.get((v, u))
+                if g is None or g in visible:
+                    continue
+                if faces[g][1].dot(apex_pos) - faces[g][2] > eps:
+                    visible.add(g)
+                    queue.append(g)
+
+        #見える面と見えない面の境界(horizon)のエッジを集めて、見える面を削除
+        horizon = []
+        candidates = []
+        for f in visible:
+            a, b, c = faces[f][0]
+            for u, v in ((a, b), (b, c), (c, a)):
+                if edges.get((v, u)) not in visible:
+                    horizon.append((u, v))
+            candidates.append(faces[f][3])
+        for f in visible:
+            a, b, c = faces.pop(f)[0]
+            for u, v in ((a, b), (b, c), (c, a)):
+                if edges.get((u, v)) == f:
+                    del edges[(u, v)]
+
+        #horizonのエッジとapexで新しい面を作り、外側の頂点を割り当て直す
+        new_faces = [addFace(u, v, apex) for u, v in horizon]
+        candidates = np.concatenate(candidates)
+        assignOutside(new_faces, candidates[candidates != apex])
+        stack.extend(f for f in new_faces if len(faces[f][3]))
+
+    return np.array([faces[f][0] for f in sorted(faces)], dtype=np.int64).reshape(-1, 3)
+
+#---------------------------------------.
+# 凸包を計算. 頂点数が多い場合は方向サンプリングで凸包の頂点候補に間引いてから計算する.
+# @param[in] points --> 座標(N,3).
+# @param[in] directions --> 間引きに使う方向の数. Noneの場合はREDUCE_DIRECTIONS.
+# @return 三角形の頂点インデックス(F,3). pointsのインデックス.
+#---------------------------------------.
+def convexHull(points, directions=None):
+    points = as_array(points)
+    if len(points) <= REDUCE_THRESHOLD:
+        return quickHull(points)
+
+    #各方向で最も外側にある頂点だけを残す(凸包の頂点の部分集合なので結果は凸包の内接近似になる)
+    indices = supportIndices(points, fibonacciDirections(directions or REDUCE_DIRECTIONS))
+    return indices[quickHull(points[indices])]
+
+#---------------------------------------.
+# 凸包の三角形を同一平面ごとにまとめる.
+# @param[in] points --> 座標(N,3).
+# @param[in] triangles --> 三角形の頂点インデックス(F,3).
+# @param[in] tolerance --> 同一平面とみなす法線の角度の許容値(内積の差).
+# @return (各三角形が属する面の番号(F,), 面の法線(M,3), 面の面積(M,)).
+#---------------------------------------.
+def hullFacets(points, triangles, tolerance=1e-4):
+    tri = as_array(points)[triangles]
+    cross = cross_vec3(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    areas = length_vec3(cross) * 0.5
+    normals = normalize_vec3(cross)
+    offsets = dot_vec3(normals, tri[:, 0])
+
+    #法線とオフセットを量子化して同じ値になる三角形を1つの面とする
+    scale = max(np.abs(offsets).max(), 1e-9)
+    keys = np.round(np.column_stack([normals / tolerance, offsets / (scale * tolerance)])).astype(np.int64)
+    _, labels = np.unique(keys, axis=0, return_inverse=True)
+    labels = labels.reshape(-1)
+
+    count = labels.max() + 1
+    facet_areas = np.bincount(labels, weights=areas, minlength=count)
+    facet_normals = np.zeros((count, 3))
+    np.add.at(facet_normals, labels, normals * areas[:, np.newaxis])
+    return (labels, normalize_vec3(facet_normals), facet_areas)
+
+#---------------------------------------.
+# 凸包(中身の詰まった多面体とみなす)の重心を計算.
+# @param[in] points --> 座標(N,3).
+# @param[in] triangles --> 三角形の頂点インデックス(F,3).
+# @return 重心(3,).
+#---------------------------------------.
+def hullCentroid(points, triangles):
+    tri = as_array(points)[triangles]
+    origin = tri.reshape(-1, 3).mean(axis=0)
+    a, b, c = tri[:, 0] - origin, tri[:, 1] - origin, tri[:, 2] - origin
+    volumes = dot_vec3(a, cross_vec3(b, c)) / 6.0
+    total = volumes.sum()
+    if abs(total) < 1e-12:
+        return origin
+    return origin + ((a + b + c) / 4.0 * volumes[:, np.newaxis]).sum(axis=0) / total
+
+#---------------------------------------.
+# 置いたときに安定する(重心を面に投影した点が面の内側にある)面を判定.
+# @param[in] points --> 座標(N,3).
+# @param[in] triangles --> 三角形の頂点インデックス(F,3).
+# @param[in] labels --> 各三角形が属する面の番号(F,).
+# @param[in] facet_normals --> 面の法線(M,3).
+# @param[in] centroid --> 重心(3,).
+# @return 安定する面ならTrue(M,).
+#---------------------------------------.
+def stableFacets(points, triangles, labels, facet_normals, centroid):
+    tri = as_array(points)[triangles]
+    normal = facet_normals[labels]
+    #重心を各三角形の平面に投影して、三角形の内側にあるかを重心座標で判定
+    proj = centroid - dot_vec3(centroid - tri[:, 0], normal)[:, np.newaxis] * normal
+    inside = np.ones(len(tri), dtype=bool)
+    for i in range(3):
+        a, b = tri[:, i], tri[:, (i + 1) % 3]
+        inside &= dot_vec3(cross_vec3(b - a, proj - a), normal) >= -1e-9
+    stable = np.zeros(len(facet_normals), dtype=bool)
+    stable[labels[inside]] = True
+    return stable
+
+#---------------------------------------.
+# 凸包から接地する面の法線を選ぶ.
+# @param[in] points --> 座標(N,3).
+# @param[in] down --> 接地する方向(対象の平面の法線の逆ベクトル)(3,).
+# @param[in] pick --> 'down' = 安定する面のうち法線がdownに最も近い面, 'largest' = 安定する面のうち最も面積が大きい面.
+# @return 面の外向きの法線(3,).
+#---------------------------------------.
+def restingNormal(points, down, pick='down'):
+    points = as_array(points)
+    down = normalize_vec3(down)
+    try:
+        triangles = convexHull(points)
+    except ValueError:
+        #平らなメッシュは当てはめた平面の法線をdownに向ける
+        normal = np.linalg.eigh(np.cov(points.T))[1][:, 0]
+        return normal if normal.dot(down) >= 0 else -normal
+
+    labels, facet_normals, facet_areas = hullFacets(points, triangles)
+    stable = stableFacets(points, triangles, labels, facet_normals, hullCentroid(points, triangles))
+    if not stable.any():
+        stable[:] = True
+
+    if pick == 'largest':
+        score = np.where(stable, facet_areas, -np.inf)
+    else:
+        score = np.where(stable, facet_normals.dot(down), -np.inf)
+    return facet_normals[score.argmax()]
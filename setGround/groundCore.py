@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import OrderedDict, namedtuple
+from functools import partial
+import hashlib
+import timeit
+
+from maya import cmds
+import numpy as np
+
+from ..common.meshGeometry import parseComponents, getFaceNormals, getVertexNormals, getTriangles
+from ..common.pcaMath import fitPlanes
+from ..common.snapshotCache import getSnapshot, getWorldPoints
+from .bvh import BVH
+from .convexHull import restingNormal
+from .vecMath import (PLANE_VECTORS, dot_vec3, length_vec3, normalize_vec3, orientNormals,
+                      MyMatrix4x4ToFloatx16, alignMatrixFromVectors)
+
+#地面メッシュ名 --> (変更番号または頂点座標のハッシュ, BVH). 地面が変更されていなければBVHを再利用する
+_terrain_cache = {}
+
+#接地対象(1オブジェクト分)
+#transform --> トランスフォーム名, mode --> '.f' or '.vtx' or 'auto', components --> 選択したコンポーネント名のリスト
+GroundTarget = namedtuple('GroundTarget', ['transform', 'mode', 'components'])
+
+#---------------------------------------.
+# 選択しているコンポーネントをオブジェクトごとにまとめる.
+# 各オブジェクトはフェース1つ または 頂点3つ以上 を選択している必要がある.
+# @param[in] selection --> コンポーネント名のリスト(Noneの場合は現在の選択).
+# @return GroundTargetのリスト.
+#---------------------------------------.
+def collectGroundTargets(selection=None):
+    if selection is None:
+        selection = cmds.filterExpand(selectionMask=(31,34), fullPath=True) or []
+
+    #ノード名ごとにコンポーネントをまとめる(選択順を保つ)
+    groups = OrderedDict()
+    for component in selection:
+        node = component.partition('.')[0]
+        groups.setdefault(node, []).append(component)
+
+    #シェイプ名で選択されている場合はトランスフォーム名に置き換える
+    shapes = set(cmds.ls(list(groups), type='mesh', long=True) or [])
+
+    targets = []
+    for node, components in groups.items():
+        transform = node
+        if node in shapes:
+            transform = cmds.listRelatives(node, parent=True, fullPath=True)[0]
+
+        if len(components) == 1 and '.f[' in components[0]:
+            targets.append(GroundTarget(transform, '.f', components))
+        elif len(components) >= 3 and all('.vtx[' in c for c in components):
+            targets.append(GroundTarget(transform, '.vtx', components))
+        else:
+            print('"{0}" is skipped. You have to select ONE face or THREE or more vertices(vertexes) per object.'.format(transform))
+    return targets
+
+#---------------------------------------.
+# 選択しているオブジェクトをそのまま接地対象にする(autoモード用).
+# @param[in] selection --> オブジェクト名のリスト(Noneの場合は現在の選択).
+# @return GroundTargetのリスト.
+#---------------------------------------.
+def collectAutoTargets(selection=None):
+    if selection is None:
+        selection = cmds.ls(selection=True, objectsOnly=True, long=True) or []
+    meshes = cmds.ls(selection, type='mesh', long=True) or []
+    meshes += cmds.listRelatives(selection, shapes=True, type='mesh', noIntermediate=True, fullPath=True) or []
+    transforms = cmds.listRelatives(meshes, parent=True, fullPath=True) or []
+    return [GroundTarget(t, 'auto', []) for t in OrderedDict.fromkeys(transforms)]
+
+#---------------------------------------.
+# 接地対象で選択しているコンポーネントの番号.
+# @param[in] target --> GroundTarget.
+# @return 番号の配列.
+#---------------------------------------.
+def componentIndices(target):
+    return np.concatenate(list(parseComponents(target.components).values()))
+
+#---------------------------------------.
+# フェースの法線(ワールド空間)をまとめて取得.
+# @param[in] targets --> modeが'.f'のGroundTargetのリスト.
+# @return フェースの法線(N,3).
+#---------------------------------------.
+def normalAdjusterByFaces(targets):
+    if not targets:
+        return np.zeros((0, 3))
+    return np.concatenate([getFaceNormals(t.transform, componentIndices(t)) for t in targets])
+
+#---------------------------------------.
+# 選択した頂点(3つ以上)に当てはめた平面の法線をまとめて取得.
+# 3頂点の場合は3頂点が作る面の法線と同じになる.
+# @param[in] targets --> modeが'.vtx'のGroundTargetのリスト.
+# @return 面の法線(N,3).
+#---------------------------------------.
+def normalAdjusterByVtxs(targets):
+    if not targets:
+        return np.zeros((0, 3))
+
+    #各オブジェクトの選択頂点の座標と頂点法線(メッシュごとに1回で取得)
+    indices = [componentIndices(t) for t in targets]
+    points = np.concatenate([getWorldPoints(t.transform)[i] for t, i in zip(targets, indices)])
+    ave_vtxNormal = np.array([getVertexNormals(t.transform, i).mean(axis=0) for t, i in zip(targets, indices)])
+
+    #最小二乗で当てはめた平面の法線
+    normals = fitPlanes(points, [len(i) for i in indices])[1]
+
+    #計算した法線と選択した頂点の頂点法線の平均との向きが逆方向なら逆ベクトルにする
+    normals = orientNormals(normals, ave_vtxNormal)
+
+    normals[np.abs(normals) < 0.0001] = 0.0
+    return normalize_vec3(normals)
+
+#---------------------------------------.
+# メッシュの凸包から置いたときに安定する面を選び、その法線を取得.
+# @param[in] targets --> modeが'auto'のGroundTargetのリスト.
+# @param[in] down --> 接地する方向(対象の平面の法線の逆ベクトル).
+# @param[in] pick --> 'down' = 法線がdownに最も近い面, 'largest' = 最も面積が大きい面.
+# @return 面の法線(N,3).
+#---------------------------------------.
+def normalAdjusterByHull(targets, down, pick='down'):
+    return np.array([restingNormal(getWorldPoints(t.transform), down, pick) for t in targets]).reshape(-1, 3)
+
+#---------------------------------------.
+# GroundTargetのリストから各オブジェクトの法線を取得.
+# @param[in] targets --> GroundTargetのリスト.
+# @param[in] down --> 接地する方向(autoモード用).
+# @param[in] pick --> autoモードで選ぶ面('down' or 'largest').
+# @return 法線(N,3). targetsと同じ順番.
+#---------------------------------------.
+def getGroundNormals(targets, down=None, pick='down'):
+    normals = np.zeros((len(targets), 3))
+    byHull = partial(normalAdjusterByHull, down=down, pick=pick)
+    for mode, func in (('.f', normalAdjusterByFaces), ('.vtx', normalAdjusterByVtxs), ('auto', byHull)):
+        indices = [i for i, t in enumerate(targets) if t.mode == mode]
+        if indices:
+            normals[indices] = func([targets[i] for i in indices])
+    return normals
+
+#---------------------------------------.
+# 各オブジェクトに回転行列を適用する(undoは1回にまとめる).
+# @param[in] transforms --> トランスフォーム名のリスト.
+# @param[in] mats --> 回転行列(N,4,4).
+#---------------------------------------.
+def applyGroundMatrices(transforms, mats):
+    mat_floats = MyMatrix4x4ToFloatx16(mats).tolist()
+    cmds.undoInfo(openChunk=True)#ヒストリをまとめる(open)
+    try:
+        for transform, mat_float in zip(transforms, mat_floats):
+            cmds.xform(transform, relative=True, matrix=mat_float)
+    finally:
+        cmds.undoInfo(closeChunk=True)#ヒストリをまとめる(close)
+
+#---------------------------------------.
+# 選択している全オブジェクトを、それぞれのフェース(または頂点に当てはめた平面)が指定の平面に接地するように回転する.
+# auto=Trueの場合はコンポーネントを選択せず、各オブジェクトの凸包から接地する面を自動で選ぶ.
+# @param[in] plane --> 'XY','-XY','XZ','-XZ','YZ','-YZ'.
+# @param[in] selection --> コンポーネント名(autoの場合はオブジェクト名)のリスト(Noneの場合は現在の選択).
+# @param[in] auto --> Trueの場合は接地する面を自動で選ぶ.
+# @param[in] pick --> autoモードで選ぶ面. 'down' = 今の下向きに最も近い安定な面, 'largest' = 最も大きい安定な面.
+# @return 回転したトランスフォーム名のリスト.
+#---------------------------------------.
+def setGroundBatch(plane="XZ", selection=None, auto=False, pick='down'):
+    start = timeit.default_timer()
+
+    targets = collectAutoTargets(selection) if auto else collectGroundTargets(selection)
+    if not targets:
+        if auto:
+            print("You have to select mesh objects.")
+        else:
+            print("You have to select ONE face or THREE or more vertices(vertexes).")
+        return []
+
+    #v1(対象のフェースの法線)
+    #v2(対象の平面の法線の逆ベクトル)
+    v2 = PLANE_VECTORS[plane]
+    v1 = getGroundNormals(targets, down=v2, pick=pick)
+
+    #v1をv2に重ねる回転行列をまとめて作成
+    mats = alignMatrixFromVectors(v1, v2)
+
+    transforms = [t.transform for t in targets]
+    applyGroundMatrices(transforms, mats)
+
+    elapsed = timeit.default_timer() - start
+    print('Grounded {0} objects in {1:.3f} sec ({2:.1f} objects/sec).'.format(
+        len(transforms), elapsed, len(transforms) / max(elapsed, 1e-9)))
+    return transforms
+
+#---------------------------------------.
+# 地面メッシュのBVHを取得. 地面が前回から変更されていなければキャッシュを使う.
+# 変更を追跡できない場合は頂点座標のハッシュで比べる.
+# @param[in] terrain --> 地面のトランスフォーム名.
+# @return BVH.
+#---------------------------------------.
+def getTerrainBVH(terrain):
+    snapshot = getSnapshot(terrain)
+    points = snapshot.points
+    key = snapshot.version
+    if key is None:
+        key = hashlib.md5(points.tobytes()).hexdigest()
+    cached = _terrain_cache.get(terrain)
+    if cached and cached[0] == key:
+        return cached[1]
+    bvh = BVH(points, getTriangles(terrain))
+    _terrain_cache[terrain] = (key, bvh)
+    return bvh
+
+#---------------------------------------.
+# 地面のBVHのキャッシュを削除.
+# @param[in] terrain --> 地面のトランスフォーム名(Noneの場合はすべて).
+#---------------------------------------.
+def clearTerrainCache(terrain=None):
+    if terrain is None:
+        _terrain_cache.clear()
+    else:
+        _terrain_cache.pop(terrain, None)
+
+#---------------------------------------.
+# 選択している全オブジェクトを真下(planeの方向)の地面メッシュに落とす.
+# 各オブジェクトのバウンディングボックスの中心からレイを飛ばし、当たった三角形の法線に合わせて回転し、
+# 一番低い頂点が地面に接するように移動する. undoは1回にまとめる.
+# @param[in] plane --> 落とす方向. 'XY','-XY','XZ','-XZ','YZ','-YZ'.
+# @param[in] selection --> オブジェクト名のリスト(Noneの場合は現在の選択).
+# @param[in] terrain --> 地面のオブジェクト名(Noneの場合は最初に選択したオブジェクト).
+# @param[in] align --> Trueの場合は地面の法線に合わせて回転する.
+# @return 移動したトランスフォーム名のリスト.
+#---------------------------------------.
+def dropToTerrain(plane="XZ", selection=None, terrain=None, align=True):
+    start = timeit.default_timer()
+
+    if selection is None:
+        selection = cmds.ls(selection=True, objectsOnly=True, long=True) or []
+    if terrain is None:
+        if len(selection) < 2:
+            print("You have to select the terrain first, then the objects to drop.")
+            return []
+        terrain, selection = selection[0], selection[1:]
+    terrain = cmds.ls(terrain, long=True)[0]
+    targets = [t for t in collectAutoTargets(selection) if t.transform != terrain]
+    if not targets:
+        print("You have to select mesh objects to drop.")
+        return []
+
+    bvh = getTerrainBVH(terrain)
+    down = normalize_vec3(PLANE_VECTORS[plane])
+
+    #全オブジェクトの頂点を連結 (offsets --> 各オブジェクトの先頭)
+    points_list = [getWorldPoints(t.transform) for t in targets]
+    counts = np.array([len(p) for p in points_list])
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    points = np.concatenate(points_list)
+
+    #バウンディングボックスの中心の、地面と全オブジェクトより上からレイを飛ばす
+    centers = (np.minimum.reduceat(points, offsets) + np.maximum.reduceat(points, offsets)) / 2.0
+    lo, hi = bvh.bounds()
+    lift = length_vec3(hi - lo) + length_vec3(points.max(axis=0) - points.min(axis=0))
+    origins = centers - down * lift
+    t, tris = bvh.intersect(origins, down)
+
+    hit = tris >= 0
+    for target, h in zip(targets, hit):
+        if not h:
+            print('"{0}" is skipped. It is not above the terrain.'.format(target.transform))
+    if not hit.any():
+        return []
+    targets = [target for target, h in zip(targets, hit) if h]
+    points = np.concatenate([p for p, h in zip(points_list, hit) if h])
+    counts, origins, t, tris = counts[hit], origins[hit], t[hit], tris[hit]
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    owner = np.repeat(np.arange(len(targets)), counts)
+
+    #当たった位置と三角形の法線(上向きにそろえる)
+    hit_points = origins + t[:, np.newaxis] * down
+    normals = orientNormals(bvh.normals[tris], -down)
+
+    #下向きのベクトルを法線の逆ベクトルに重ねる回転
+    if align:
+        mats = alignMatrixFromVectors(down, -normals)
+    else:
+        mats = np.broadcast_to(np.eye(4), (len(targets), 4, 4))
+
+    #回転後の頂点の、地面(当たった三角形の平面)からの高さ
+    #回転はrotatePivotを中心に行われるので 高さ = (p - pivot)R・n + (pivot - hit)・n = (p - pivot)・(Rn) + (pivot - hit)・n
+    pivots = np.array([cmds.xform(target.transform, query=True, worldSpace=True, rotatePivot=True) for target in targets])
+    rotated_normals = np.einsum('kij,kj->ki', mats[:, :3, :3], normals)
+    heights = dot_vec3(points - pivots[owner], rotated_normals[owner])
+    heights = np.minimum.reduceat(heights, offsets) + dot_vec3(pivots - hit_points, normals)
+
+    #一番低い頂点が地面に接するまでdown方向に移動
+    moves = (heights / dot_vec3(-down, normals))[:, np.newaxis] * down
+
+    transforms = [target.transform for target in targets]
+    mat_floats = MyMatrix4x4ToFloatx16(mats).tolist()
+    cmds.undoInfo(openChunk=True)#ヒストリをまとめる(open)
+    try:
+        for transform, mat_float, move in zip(transforms, mat_floats, moves.tolist()):
+            if align:
+                cmds.xform(transform, relative=True, matrix=mat_float)
+            cmds.move(move[0], move[1], move[2], transform, relative=True, worldSpace=True)
+    finally:
+        cmds.undoInfo(closeChunk=True)#ヒストリをまとめる(close)
+
+    elapsed = timeit.default_timer() - start
+    print('Dropped {0} objects onto "{1}" in {2:.3f} sec ({3:.1f} objects/sec).'.format(
+        len(transforms), terrain, elapsed, len(transforms) / max(elapsed, 1e-9)))
+    return transforms
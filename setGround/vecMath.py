@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+#setGround.py と setGround_ui.py で共有するベクトル/行列演算
+#すべての関数は (N,3) / (N,4) / (N,4,4) の配列をまとめて処理する(先頭の次元はブロードキャストされる)
+#単体のベクトル(3,)を渡した場合は単体の結果を返す
+
+EPSILON = 1e-5
+
+#平面名 --> 対象の平面の法線の逆ベクトル
+PLANE_VECTORS = {
+    "XY": (0.0, 0.0, -1.0),
+    "-XY": (0.0, 0.0, 1.0),
+    "XZ": (0.0, -1.0, 0.0),
+    "-XZ": (0.0, 1.0, 0.0),
+    "YZ": (-1.0, 0.0, 0.0),
+    "-YZ": (1.0, 0.0, 0.0),
+}
+
+def as_array(v):
+    return np.asarray(v, dtype=np.float64)
+
+#---------------------------------------.
+# ゼロチェック.
+# @param[in] v   実数値(配列).
+# @return ゼロの場合はTrue(bool配列).
+#---------------------------------------.
+def isZero(v):
+    return np.abs(v) < EPSILON
+
+#---------------------------------------.
+# ベクトルの長さを計算.
+# @param[in] v   ベクトル値(...,3)または(...,4).
+# @return ベクトルの長さ(...).
+#---------------------------------------.
+def length_vec3(v):
+    return np.sqrt(np.einsum('...i,...i->...', as_array(v), as_array(v)))
+length_vec4 = length_vec3
+
+#---------------------------------------.
+# 単位ベクトルを計算.
+# @param[in] v   ベクトル値(...,3)または(...,4).
+# @return 正規化されたベクトル値(長さがゼロのものはゼロベクトル).
+#---------------------------------------.
+def normalize_vec3(v):
+    v = as_array(v)
+    length = length_vec3(v)[..., np.newaxis]
+    zero = isZero(length)
+    return np.where(zero, 0.0, v / np.where(zero, 1.0, length))
+normalize_vec4 = normalize_vec3
+
+#---------------------------------------.
+# 内積を計算.
+# @param[in] v1   xyzのベクトル1(...,3).
+# @param[in] v2   xyzのベクトル2(...,3).
+# @return 内積の値(...).
+#---------------------------------------.
+def dot_vec3(v1, v2):
+    return np.einsum('...i,...i->...', as_array(v1), as_array(v2))
+
+#---------------------------------------.
+# 外積を計算.
+# @param[in] v1 --> xyzのベクトル1(...,3).
+# @param[in] v2 --> xyzのベクトル2(...,3).
+# @return 外積のベクトル(...,3).
+#---------------------------------------.
+def cross_vec3(v1, v2):
+    return np.cross(as_array(v1), as_array(v2))
+
+#---------------------------------------.
+# ベクトルの平均を計算.
+# @param[in] v --> 複数のベクトル(N,3).
+# @return ベクトルの平均(3,).
+#---------------------------------------.
+def ave_vec3(v):
+    return as_array(v).mean(axis=-2)
+
+def getRadianFromDegree(deg):
+    return np.radians(deg)
+def getDegreeFromRadian(rad):
+    return np.degrees(rad)
+
+#---------------------------------------.
+# クォータニオンを作成.
+# @param[in] v --> 回転軸(...,3).
+# @param[in] rad --> 角度(...).
+# @return クォータニオン(...,4) [x,y,z,w].
+#---------------------------------------.
+def MyQuaternion(v, rad):
+    half = as_array(rad)[..., np.newaxis] / 2.0
+    return np.concatenate([as_array(v) * np.sin(half), np.cos(half)], axis=-1)
+
+#---------------------------------------.
+# v1をv2に重ねる回転のクォータニオンを作成.
+# v1とv2が逆向きの場合はv1に垂直な任意の軸で180度回転する.
+# @param[in] v1 --> 回転前のベクトル(...,3).
+# @param[in] v2 --> 回転後のベクトル(...,3).
+# @return クォータニオン(...,4) [x,y,z,w].
+#---------------------------------------.
+def MyQuaternionFromTwoVectors(v1, v2):
+    v1, v2 = np.broadcast_arrays(as_array(v1), as_array(v2))
+    #v1とv2との外積 --> 回転軸
+    pivot = cross_vec3(v1, v2)
+    #v1とv2とがなす角を求めるための余弦(cos)の値
+    lengths = length_vec3(v1) * length_vec3(v2)
+    cos = dot_vec3(v1, v2) / np.where(isZero(lengths), 1.0, lengths)
+    rad = np.arccos(np.clip(cos, -1.0, 1.0))
+
+    #平行で逆向きの場合は外積がゼロになるので、v1と最も垂直に近い座標軸との外積を回転軸にする
+    opposite = isZero(length_vec3(pivot)) & (cos < 0.0)
+    if np.any(opposite):
+        axis = np.eye(3)[np.argmin(np.abs(v1), axis=-1)]
+        pivot = np.where(opposite[..., np.newaxis], cross_vec3(v1, axis), pivot)
+
+    #クォータニオンを作成するために正規化しておく
+    return MyQuaternion(normalize_vec3(pivot), rad)
+
+#---------------------------------------.
+# xyzの回転角度(ラジアン)からクォータニオンを作成.
+# @param[in] x --> x軸回転角度(...).
+# @param[in] y --> y軸回転角度(...).
+# @param[in] z --> z軸回転角度(...).
+# @return クォータニオン(...,4).
+#---------------------------------------.
+def MyQuaternionFromXYZ(x, y, z):
+    x, y, z = np.broadcast_arrays(as_array(x) / 2.0, as_array(y) / 2.0, as_array(z) / 2.0)
+    sin_x, cos_x = np.sin(x), np.cos(x)
+    sin_y, cos_y = np.sin(y), np.cos(y)
+    sin_z, cos_z = np.sin(z), np.cos(z)
+    return np.stack([
+        cos_x*sin_y*sin_z + sin_x*cos_y*cos_z,
+        -1*sin_x*cos_y*sin_z + cos_x*sin_y*cos_z,
+        cos_x*cos_y*sin_z + sin_x*sin_y*cos_z,
+        -1*sin_x*sin_y*sin_z + cos_x*cos_y*cos_z,
+    ], axis=-1)
+
+#---------------------------------------.
+# xyzの回転角度(ラジアン)から回転行列を作成.
+# @param[in] x --> x軸回転角度(...).
+# @param[in] y --> y軸回転角度(...).
+# @param[in] z --> z軸回転角度(...).
+# @return 回転行列(...,4,4).
+#---------------------------------------.
+def MyRotateMatrixFromXYZ(x, y, z):
+    x, y, z = np.broadcast_arrays(as_array(x), as_array(y), as_array(z))
+    sin_x, cos_x = np.sin(x), np.cos(x)
+    sin_y, cos_y = np.sin(y), np.cos(y)
+    sin_z, cos_z = np.sin(z), np.cos(z)
+
+    mat = np.zeros(x.shape + (4, 4))
+    mat[..., 0, 0] = cos_y*cos_z
+    mat[..., 0, 1] = -1*cos_x*sin_z + sin_x*sin_y*cos_z
+    mat[..., 0, 2] = sin_x*sin_z + cos_x*sin_y*cos_z
+
+    mat[..., 1, 0] = cos_y*sin_z
+    mat[..., 1, 1] = cos_x*cos_z + sin_x*sin_y*sin_z
+    mat[..., 1, 2] = -1*sin_x*cos_z + cos_x*sin_y*sin_z
+
+    mat[..., 2, 0] = -1*sin_y
+    mat[..., 2, 1] = sin_x*cos_y
+    mat[..., 2, 2] = cos_x*cos_y
+
+    mat[..., 3, 3] = 1.0
+    return mat
+
+#---------------------------------------.
+# クォータニオンから回転行列(4x4)を作成.
+# @param[in] quat --> クォータニオン(...,4).
+# @return 回転行列(...,4,4).
+#---------------------------------------.
+def MyQuaternionToMatrix4x4(quat):
+    quat = as_array(quat)
+    x, y, z, w = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+
+    mat = np.zeros(quat.shape[:-1] + (4, 4))
+    mat[..., 0, 0] = 1 - 2*(y*y) - 2*(z*z)
+    mat[..., 0, 1] = 2*x*y + 2*w*z
+    mat[..., 0, 2] = 2*x*z - 2*w*y
+
+    mat[..., 1, 0] = 2*x*y - 2*w*z
+    mat[..., 1, 1] = 1 - 2*(x*x) - 2*(z*z)
+    mat[..., 1, 2] = 2*y*z + 2*w*x
+
+    mat[..., 2, 0] = 2*x*z + 2*w*y
+    mat[..., 2, 1] = 2*y*z - 2*w*x
+    mat[..., 2, 2] = 1 - 2*(x*x) - 2*(y*y)
+
+    mat[..., 3, 3] = 1.0
+    return mat
+
+#---------------------------------------.
+# 回転行列(4x4)から配列(float x16)を作成.
+# @param[in] m --> 回転行列(...,4,4).
+# @return 配列(...,16).
+#---------------------------------------.
+def MyMatrix4x4ToFloatx16(m):
+    m = as_array(m)
+    return m.reshape(m.shape[:-2] + (16,))
+
+#---------------------------------------.
+# v1(フェースの法線)をv2(対象の平面の法線の逆ベクトル)に重ねる回転行列を作成.
+# @param[in] v1 --> 回転前のベクトル(...,3).
+# @param[in] v2 --> 回転後のベクトル(...,3).
+# @return xformに渡せる回転行列(...,4,4).
+#---------------------------------------.
+def alignMatrixFromVectors(v1, v2):
+    return MyQuaternionToMatrix4x4(MyQuaternionFromTwoVectors(v1, v2))
+
+#---------------------------------------.
+# 行列 x ベクトル (return = A * B).
+# @param[in] matA --> 行列(...,4,4).
+# @param[in] matB --> xyzのベクトル(...,3).
+# @return 変換後のベクトル(...,3).
+#---------------------------------------.
+def matrixTransform(matA, matB):
+    matB = as_array(matB)
+    pos = np.concatenate([matB, np.ones(matB.shape[:-1] + (1,))], axis=-1)
+    return np.einsum('...ij,...j->...i', as_array(matA), pos)[..., :3]
+
+#---------------------------------------.
+# 座標 x 行列 (Mayaの行ベクトル形式. xformのmatrixと同じ並び).
+# @param[in] points --> 座標(...,3).
+# @param[in] mat --> 行列(...,4,4)または全座標共通の行列(4,4).
+# @return 変換後の座標(...,3).
+#---------------------------------------.
+def pointsTransform(points, mat):
+    mat = as_array(mat)
+    return np.einsum('...j,...jk->...k', as_array(points), mat[..., :3, :3]) + mat[..., 3, :3]
+
+#---------------------------------------.
+# 法線の向きを参照ベクトル(頂点法線の平均など)に揃える.
+# @param[in] normals --> 法線(...,3).
+# @param[in] refs --> 参照ベクトル(...,3).
+# @return 参照ベクトルとの内積が負のものを反転した法線(...,3).
+#---------------------------------------.
+def orientNormals(normals, refs):
+    normals = as_array(normals)
+    return np.where((dot_vec3(normals, refs) < 0)[..., np.newaxis], -normals, normals)
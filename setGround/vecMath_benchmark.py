@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+"""vecMath(一括計算)と従来の1ベクトルずつの計算との速度比較. Mayaなしで実行できます.
+
+python -m setGround.vecMath_benchmark
+"""
+
+import math
+import timeit
+
+import numpy as np
+
+from . import vecMath as vm
+
+#---------------------------------------.
+# 以下は比較用の従来の実装(setGround.py から移したもの).
+#---------------------------------------.
+def _length_vec3(v):
+    return pow(v[0]*v[0] + v[1]*v[1] + v[2]*v[2], 0.5)
+
+def _normalize_vec3(v):
+    len = _length_vec3(v)
+    if -1e-5 < len < 1e-5:
+        return [0, 0, 0]
+    return [v[0]/len,v[1]/len,v[2]/len]
+
+def _dot_vec3(v1, v2):
+    return v1[0]*v2[0] + v1[1]*v2[1] + v1[2]*v2[2]
+
+def _cross_vec3(v1, v2):
+    return [v1[1]*v2[2]-v1[2]*v2[1], v1[2]*v2[0]-v1[0]*v2[2], v1[0]*v2[1]-v1[1]*v2[0]]
+
+def _MyQuaternion(v, rad):
+    return [v[0]*math.sin(rad/2), v[1]*math.sin(rad/2), v[2]*math.sin(rad/2), math.cos(rad/2)]
+
+def _MyQuaternionToMatrix4x4(quat):
+    mat = [[1 for _ in range(4)] for _ in range(4)]
+    mat[0][0] = 1 - 2*(quat[1]*quat[1]) - 2*(quat[2]*quat[2])
+    mat[0][1] = 2*quat[0]*quat[1] + 2*quat[3]*quat[2]
+    mat[0][2] = 2*quat[0]*quat[2] - 2*quat[3]*quat[1]
+    mat[0][3] = 0.0
+    mat[1][0] = 2*quat[0]*quat[1] - 2*quat[3]*quat[2]
+    mat[1][1] = 1 - 2*(quat[0]*quat[0]) - 2*(quat[2]*quat[2])
+    mat[1][2] = 2*quat[1]*quat[2] + 2*quat[3]*quat[0]
+    mat[1][3] = 0.0
+    mat[2][0] = 2*quat[0]*quat[2] + 2*quat[3]*quat[1]
+    mat[2][1] = 2*quat[1]*quat[2] - 2*quat[3]*quat[0]
+    mat[2][2] = 1 - 2*(quat[0]*quat[0]) - 2*(quat[1]*quat[1])
+    mat[2][3] = 0.0
+    mat[3][0] = 0.0
+    mat[3][1] = 0.0
+    mat[3][2] = 0.0
+    mat[3][3] = 1.0
+    return mat
+
+def _MyRotateMatrixFromXYZ(x,y,z):
+    sin_x, cos_x = math.sin(x), math.cos(x)
+    sin_y, cos_y = math.sin(y), math.cos(y)
+    sin_z, cos_z = math.sin(z), math.cos(z)
+    return [[cos_y*cos_z, -1*cos_x*sin_z + sin_x*sin_y*cos_z, sin_x*sin_z + cos_x*sin_y*cos_z, 0.0],
+            [cos_y*sin_z, cos_x*cos_z + sin_x*sin_y*sin_z, -1*sin_x*cos_z + cos_x*sin_y*sin_z, 0.0],
+            [-1*sin_y, sin_x*cos_y, cos_x*cos_y, 0.0],
+            [0.0, 0.0, 0.0, 1.0]]
+
+def _matrixTransform(m1, v):
+    m2 = list(v) + [1.0]
+    return [m1[i][0]*m2[0] + m1[i][1]*m2[1] + m1[i][2]*m2[2] + m1[i][3]*m2[3] for i in range(3)]
+
+def _legacy_ground(normals, rotations, v2):
+    result = []
+    for v1, rot in zip(normals, rotations):
+        v1 = _matrixTransform(_MyRotateMatrixFromXYZ(*rot), v1)
+        pivot = _normalize_vec3(_cross_vec3(v1, v2))
+        cos = _dot_vec3(v1, v2) / (_length_vec3(v1)*_length_vec3(v2))
+        mat = _MyQuaternionToMatrix4x4(_MyQuaternion(pivot, math.acos(max(-1.0, min(1.0, cos)))))
+        result.append(mat)
+    return result
+
+def _batch_ground(normals, rotations, v2):
+    v1 = vm.matrixTransform(vm.MyRotateMatrixFromXYZ(rotations[:, 0], rotations[:, 1], rotations[:, 2]), normals)
+    return vm.alignMatrixFromVectors(v1, v2)
+
+#---------------------------------------.
+# ベンチマークを実行して結果を表示.
+# @param[in] count --> オブジェクト数.
+# @param[in] repeat --> 計測回数(最速の値を採用).
+# @return (従来の秒数, 一括計算の秒数).
+#---------------------------------------.
+def main(count=10000, repeat=3):
+    rng = np.random.RandomState(0)
+    normals = vm.normalize_vec3(rng.uniform(-1.0, 1.0, (count, 3)))
+    rotations = rng.uniform(-math.pi, math.pi, (count, 3))
+    v2 = np.array(vm.PLANE_VECTORS["XZ"])
+
+    normals_list = normals.tolist()
+    rotations_list = rotations.tolist()
+    v2_list = v2.tolist()
+
+    legacy = min(timeit.repeat(lambda: _legacy_ground(normals_list, rotations_list, v2_list), number=1, repeat=repeat))
+    batch = min(timeit.repeat(lambda: _batch_ground(normals, rotations, v2), number=1, repeat=repeat))
+
+    diff = np.abs(np.array(_legacy_ground(normals_list, rotations_list, v2_list)) - _batch_ground(normals, rotations, v2)).max()
+    print("objects    : {0}".format(count))
+    print("per-vector : {0:.4f} sec".format(legacy))
+    print("batched    : {0:.4f} sec ({1:.1f}x)".format(batch, legacy / batch))
+    print("max diff   : {0:.3e}".format(diff))
+    return (legacy, batch)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from collections import OrderedDict
+import struct
+import zlib
+
+import numpy as np
+
+try:
+    import maya.cmds as mc
+except ImportError:
+    #Mayaの外(テスト)ではFakeLockBackendを使い、名前はシェイプ名として扱い、取り消し単位は省く
+    mc = None
+
+try:
+    import maya.api.OpenMaya as om
+except ImportError:
+    om = None
+
+from ..common.meshGeometry import parseComponents, indexRanges
+
+#vtxLock.py と vtxLock_ui.py で共有する処理
+#選択した頂点をメッシュごとにまとめ、連続した番号を pnts[a:b] の範囲にしてsetAttrでロック/解除する
+#コマンドの数は頂点の数ではなく範囲の数(x 要素と子3つ)になる
+#ロック状態はメッシュごとのbool配列で扱い、保存するときはビット列を圧縮したバイト列にする
+#要素(pnts[i])か子(pntx/pnty/pntz)のどれか1つでもロックされている頂点はロックとみなし、設定するときは4つともそろえる
+
+#保存したロック状態のバイト列の先頭
+_BLOB_HEADER = b'VLK1'
+#pntsの要素の子アトリビュート
+_CHILDREN = ('pntx', 'pnty', 'pntz')
+#プラグ名(pnts[i], pnts[i].pntx)の数字以外を空白にする表. 数字は頂点番号だけなので残りを数値として読める
+_DIGITS_ONLY = bytes(bytearray(c if 48 <= c <= 57 else 32 for c in range(256)))
+
+#---------------------------------------.
+# ノードのメッシュシェイプを取得.
+# @param[in] node --> トランスフォーム名 または シェイプ名.
+# @return シェイプ名. メッシュでない場合はNone. Mayaの外ではnodeをそのまま返す.
+#---------------------------------------.
+def getMeshShape(node):
+    if mc is None:
+        return node
+    if mc.ls(node, type='mesh'):
+        return mc.ls(node, long=True)[0]
+    shapes = mc.listRelatives(node, shapes=True, type='mesh', noIntermediate=True, fullPath=True) or []
+    return shapes[0] if shapes else None
+
+#---------------------------------------.
+# 選択している頂点をメッシュごとにまとめる(1頂点ずつに展開しない).
+# @param[in] selection --> 頂点のコンポーネント名のリスト(Noneの場合は現在の選択).
+# @return OrderedDict {シェイプ名: 頂点番号の配列(重複なし・昇順)}.
+#---------------------------------------.
+def getSelectedVertices(selection=None):
+    if selection is None:
+        selection = mc.ls(selection=True, type='float3', long=True) or []
+    vertices = OrderedDict()
+    for (node, kind), indices in parseComponents(selection).items():
+        if kind != 'vtx':
+            continue
+        shape = getMeshShape(node)
+        if shape is None:
+            continue
+        if shape in vertices:
+            indices = np.union1d(vertices[shape], indices)
+        vertices[shape] = indices
+    return vertices
+
+#---------------------------------------.
+# 頂点のロック状態の問い合わせ・設定のインターフェース.
+#---------------------------------------.
+class LockBackend(object):
+    #頂点数
+    def vertexCount(self, shape):
+        raise NotImplementedError
+    #ロックされている頂点番号の配列(要素か子のどれかがロックされているもの)
+    def lockedIndices(self, shape):
+        raise NotImplementedError
+    #範囲(R,2)(末尾を含む)ごとにロック/解除する
+    def setLocked(self, shape, ranges, lock):
+        raise NotImplementedError
+
+#---------------------------------------.
+# Mayaのバックエンド. 読み込みはOpenMayaとlistAttr、書き込みは取り消せるようにsetAttrを使う.
+#---------------------------------------.
+class MayaLockBackend(LockBackend):
+    def _dag(self, shape):
+        selection = om.MSelectionList()
+        selection.add(shape)
+        return selection.getDagPath(0)
+
+    def vertexCount(self, shape):
+        return om.MFnMesh(self._dag(shape)).numVertices
+
+    def lockedIndices(self, shape):
+        #ロックされたプラグ名を要素と子ごとに1回のlistAttrで取得し、番号はまとめて取り出す(プラグを1つずつ調べない)
+        #要素が作られていない頂点はロックされていない. 要素か子のどれか1つでもロックされていればロックとする
+        names = []
+        for attr in ['pnts[*]'] + ['pnts[*].' + child for child in _CHILDREN]:
+            try:
+                names += mc.listAttr('{0}.{1}'.format(shape, attr), locked=True) or []
+            except (RuntimeError, ValueError):
+                #要素が1つも作られていない
+                pass
+        if not names:
+            return np.zeros(0, dtype=np.int64)
+        text = ' '.join(names).encode('ascii').translate(_DIGITS_ONLY).decode('ascii')
+        indices = np.fromstring(text, dtype=np.int64, sep=' ')
+        return np.flatnonzero(np.bincount(indices))
+
+    def setLocked(self, shape, ranges, lock):
+        #以前のvtxLockは .px/.py/.pz をロックしていたので、要素と子(pntx/pnty/pntz)の両方を設定する
+        for start, end in np.asarray(ranges, dtype=np.int64).reshape(-1, 2).tolist():
+            plug = '{0}.pnts[{1}]'.format(shape, start) if start == end else '{0}.pnts[{1}:{2}]'.format(shape, start, end)
+            mc.setAttr(plug, lock=lock)
+            for child in _CHILDREN:
+                mc.setAttr('{0}.{1}'.format(plug, child), lock=lock)
+
+#---------------------------------------.
+# Mayaを使わないバックエンド(テスト用).
+# @param[in] states --> {シェイプ名: ロック状態のbool配列(N,) または 要素とx,y,zごとのbool配列(N,4)}.
+#---------------------------------------.
+class FakeLockBackend(LockBackend):
+    def __init__(self, states=None):
+        self.states = {}
+        for shape, state in (states or {}).items():
+            state = np.asarray(state, dtype=bool)
+            if state.ndim == 1:
+                state = np.repeat(state[:, np.newaxis], 1 + len(_CHILDREN), axis=1)
+            self.states[shape] = state.copy()
+        #setLockedで設定した範囲の数
+        self.calls = 0
+
+    def vertexCount(self, shape):
+        return len(self.states[shape])
+
+    def lockedIndices(self, shape):
+        return np.flatnonzero(self.states[shape].any(axis=1))
+
+    def setLocked(self, shape, ranges, lock):
+        for start, end in np.asarray(ranges, dtype=np.int64).reshape(-1, 2).tolist():
+            self.states[shape][start:end + 1] = lock
+            self.calls += 1
+
+_backend = [MayaLockBackend() if om is not None else None]
+
+#---------------------------------------.
+# 使用するバックエンドを取得/設定.
+#---------------------------------------.
+def getBackend():
+    return _backend[0]
+def setBackend(backend):
+    _backend[0] = backend
+
+#---------------------------------------.
+# 取り消し単位を開く/閉じる(Mayaの外では何もしない).
+#---------------------------------------.
+def _openChunk():
+    if mc is not None:
+        mc.undoInfo(openChunk=True)
+def _closeChunk():
+    if mc is not None:
+        mc.undoInfo(closeChunk=True)
+
+#---------------------------------------.
+# メッシュの全頂点のロック状態を取得.
+# @param[in] shape --> シェイプ名.
+# @return bool配列(N,). Trueがロック.
+#---------------------------------------.
+def getLockState(shape):
+    backend = getBackend()
+    state = np.zeros(backend.vertexCount(shape), dtype=bool)
+    locked = backend.lockedIndices(shape)
+    state[locked[locked < len(state)]] = True
+    return state
+
+#---------------------------------------.
+# ロック状態を小さなバイト列にする(ビット列をzlibで圧縮).
+# @param[in] state --> bool配列(N,).
+# @return バイト列.
+#---------------------------------------.
+def packLockState(state):
+    state = np.asarray(state, dtype=bool)
+    return _BLOB_HEADER + struct.pack('<I', len(state)) + zlib.compress(np.packbits(state).tobytes())
+
+#---------------------------------------.
+# packLockStateで作ったバイト列をロック状態に戻す.
+# @param[in] blob --> バイト列.
+# @return bool配列(N,).
+#---------------------------------------.
+def unpackLockState(blob):
+    if blob[:len(_BLOB_HEADER)] != _BLOB_HEADER:
+        raise ValueError('Not a vertex lock state.')
+    offset = len(_BLOB_HEADER)
+    count = struct.unpack_from('<I', blob, offset)[0]
+    bits = np.frombuffer(zlib.decompress(blob[offset + 4:]), dtype=np.uint8)
+    return np.unpackbits(bits)[:count].astype(bool)
+
+#---------------------------------------.
+# メッシュのロック状態を指定の状態にする. 変わる頂点だけを範囲にまとめて設定する.
+# @param[in] shape --> シェイプ名.
+# @param[in] state --> bool配列(N,).
+# @param[in] current --> 今のロック状態(Noneの場合は取得する).
+# @return 設定した範囲の数.
+#---------------------------------------.
+def applyLockState(shape, state, current=None):
+    backend = getBackend()
+    if current is None:
+        current = getLockState(shape)
+    state = np.asarray(state, dtype=bool)
+    count = min(len(state), len(current))
+    changed = state[:count] != current[:count]
+    to_lock = indexRanges(np.flatnonzero(changed & state[:count]))
+    to_unlock = indexRanges(np.flatnonzero(changed & ~state[:count]))
+    if len(to_lock):
+        backend.setLocked(shape, to_lock, True)
+    if len(to_unlock):
+        backend.setLocked(shape, to_unlock, False)
+    return len(to_lock) + len(to_unlock)
+
+#---------------------------------------.
+# 頂点をまとめてロック/解除する(1回の取り消し単位).
+# @param[in] vertices --> {シェイプ名: 頂点番号の配列}.
+# @param[in] lock --> Trueの場合はロック、Falseの場合は解除.
+# @return 設定した範囲の数.
+#---------------------------------------.
+def setLocks(vertices, lock):
+    count = 0
+    _openChunk()
+    try:
+        for shape, indices in vertices.items():
+            ranges = indexRanges(indices)
+            getBackend().setLocked(shape, ranges, lock)
+            count += len(ranges)
+    finally:
+        _closeChunk()
+    return count
+
+#---------------------------------------.
+# 選択した頂点をロックする.
+# @param[in] selection --> 頂点のコンポーネント名のリスト(Noneの場合は現在の選択).
+# @return 設定した範囲の数.
+#---------------------------------------.
+def lock(selection=None):
+    return setLocks(getSelectedVertices(selection), True)
+
+#---------------------------------------.
+# 選択した頂点のロックを解除する.
+# @param[in] selection --> 頂点のコンポーネント名のリスト(Noneの場合は現在の選択).
+# @return 設定した範囲の数.
+#---------------------------------------.
+def unlock(selection=None):
+    return setLocks(getSelectedVertices(selection), False)
+
+#---------------------------------------.
+# 選択した頂点のロックを切り替える.
+# メッシュごとに ロック状態 XOR 選択 を新しい状態にして、変わる頂点だけを範囲にまとめて設定する.
+# @param[in] selection --> 頂点のコンポーネント名のリスト(Noneの場合は現在の選択).
+# @return 設定した範囲の数.
+#---------------------------------------.
+def toggle(selection=None):
+    count = 0
+    _openChunk()
+    try:
+        for shape, indices in getSelectedVertices(selection).items():
+            current = getLockState(shape)
+            mask = np.zeros(len(current), dtype=bool)
+            mask[indices[indices < len(current)]] = True
+            count += applyLockState(shape, current ^ mask, current)
+    finally:
+        _closeChunk()
+    return count
+
+#---------------------------------------.
+# メッシュのロック状態を保存する.
+# @param[in] shapes --> シェイプ名のリスト(Noneの場合は選択しているメッシュ).
+# @return {シェイプ名: バイト列}.
+#---------------------------------------.
+def saveLockState(shapes=None):
+    if shapes is None:
+        nodes = mc.ls(selection=True, objectsOnly=True, long=True) or []
+        shapes = [shape for shape in OrderedDict.fromkeys(getMeshShape(node) for node in nodes) if shape]
+    return OrderedDict((shape, packLockState(getLockState(shape))) for shape in shapes)
+
+#---------------------------------------.
+# saveLockStateで保存したロック状態に戻す(1回の取り消し単位).
+# @param[in] blobs --> {シェイプ名: バイト列}.
+# @return 設定した範囲の数.
+#---------------------------------------.
+def restoreLockState(blobs):
+    count = 0
+    _openChunk()
+    try:
+        for shape, blob in blobs.items():
+            count += applyLockState(shape, unpackLockState(blob))
+    finally:
+        _closeChunk()
+    return count
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+"""lockCore のロック状態の取得・保存・復元の速度. mayapyではMayaのバックエンドで、それ以外ではFakeLockBackendで計測します.
+
+lockCoreはcommonを使うので、このリポジトリのフォルダ(<package>)の親フォルダで実行します.
+python -m <package>.vtxLock.lockCore_benchmark
+mayapy -m <package>.vtxLock.lockCore_benchmark
+"""
+
+import timeit
+
+import numpy as np
+
+from . import lockCore as lc
+
+#---------------------------------------.
+# 計測用のロック状態(一定の間隔で範囲をロックし、一部は以前のvtxLockと同じくx,y,zだけをロックする).
+# @param[in] count --> 頂点数.
+# @return (ロックする範囲(R,2), x,y,zだけをロックする頂点番号).
+#---------------------------------------.
+def _pattern(count):
+    starts = np.arange(0, count, 1000)
+    ranges = np.column_stack([starts, np.minimum(starts + 499, count - 1)])
+    per_axis = np.arange(700, count, 1000)
+    return (ranges, per_axis)
+
+#---------------------------------------.
+# Mayaでグリッドのメッシュを作り、ロックする.
+# @param[in] size --> 1辺の頂点数.
+# @return シェイプ名.
+#---------------------------------------.
+def _mayaMesh(size):
+    transform = lc.mc.polyPlane(subdivisionsX=size - 1, subdivisionsY=size - 1, constructionHistory=False)[0]
+    shape = lc.getMeshShape(transform)
+    ranges, per_axis = _pattern(size * size)
+    lc.getBackend().setLocked(shape, ranges, True)
+    for index in per_axis.tolist():
+        for child in ('px', 'py', 'pz'):
+            lc.mc.setAttr('{0}.vtx[{1}].{2}'.format(shape, index, child), lock=True)
+    return shape
+
+#---------------------------------------.
+# FakeLockBackendでメッシュを作る.
+# @param[in] size --> 1辺の頂点数.
+# @return シェイプ名.
+#---------------------------------------.
+def _fakeMesh(size):
+    count = size * size
+    states = np.zeros((count, 4), dtype=bool)
+    ranges, per_axis = _pattern(count)
+    for start, end in ranges.tolist():
+        states[start:end + 1] = True
+    states[per_axis, 1:] = True
+    lc.setBackend(lc.FakeLockBackend({'grid': states}))
+    return 'grid'
+
+#---------------------------------------.
+# ベンチマークを実行して結果を表示.
+# @param[in] size --> グリッドの1辺の頂点数(頂点数は size x size).
+# @param[in] repeat --> 計測回数(最速の値を採用).
+# @return {'query', 'save', 'restore'} それぞれの秒数.
+#---------------------------------------.
+def main(size=1000, repeat=3):
+    use_maya = lc.mc is not None and lc.om is not None
+    previous = lc.getBackend()
+    shape = _mayaMesh(size) if use_maya else _fakeMesh(size)
+    try:
+        state = lc.getLockState(shape)
+        query = min(timeit.repeat(lambda: lc.getLockState(shape), number=1, repeat=repeat))
+        save = min(timeit.repeat(lambda: lc.saveLockState([shape]), number=1, repeat=repeat))
+        blob = lc.saveLockState([shape])
+
+        #すべて解除してから復元する(復元するのは変わる範囲だけ)
+        def _restore():
+            lc.getBackend().setLocked(shape, [[0, len(state) - 1]], False)
+            start = timeit.default_timer()
+            lc.restoreLockState(blob)
+            return timeit.default_timer() - start
+        restore = min(_restore() for _ in range(repeat))
+        restored = lc.getLockState(shape)
+    finally:
+        if use_maya:
+            lc.mc.delete(lc.mc.listRelatives(shape, parent=True, fullPath=True))
+        else:
+            lc.setBackend(previous)
+
+    print("backend    : {0}".format('Maya' if use_maya else 'Fake'))
+    print("vertices   : {0} ({1} locked)".format(len(state), int(state.sum())))
+    print("query      : {0:.4f} sec".format(query))
+    print("save       : {0:.4f} sec ({1} bytes)".format(save, len(blob[shape])))
+    print("restore    : {0:.4f} sec".format(restore))
+    print("round trip : {0}".format('ok' if (restored == state).all() else 'MISMATCH'))
+    return {'query': query, 'save': save, 'restore': restore}
+
+if __name__ == "__main__":
+    try:
+        #mayapyで実行する場合
+        import maya.standalone
+        maya.standalone.initialize()
+    except ImportError:
+        pass
+    main()
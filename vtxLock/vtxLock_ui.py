@@ -12,6 +12,8 @@ from maya.app.general.mayaMixin import MayaQWidgetBaseMixin, MayaQWidgetDockable
 from PySide2 import QtCore, QtGui, QtWidgets, QtUiTools
 from shiboken2 import wrapInstance 
 
+from . import lockCore
+
 
 def this_dir(*args):
     """このスクリプトと同じフォルダからの相対パスをフルパスに変換して返す"""
@@ -48,6 +50,11 @@ class CreatePolygonUI(MayaQWidgetBaseMixin, QtWidgets.QWidget):
         self.ui.button_toggle.clicked.connect(self.toggle)
         self.ui.button_on.clicked.connect(self.on)
         self.ui.button_off.clicked.connect(self.off)
+        self.ui.button_save.clicked.connect(self.save)
+        self.ui.button_restore.clicked.connect(self.restore)
+
+        # 保存したロック状態 {シェイプ名: バイト列}
+        self.saved_state = None
 
     def initUI(self, ui_filename):
         ui_loader = QtUiTools.QUiLoader()        
@@ -58,31 +65,27 @@ class CreatePolygonUI(MayaQWidgetBaseMixin, QtWidgets.QWidget):
         return ui
 
     def toggle(self):
-        selVtxList = cmds.ls(sl=True, flatten=True, type="float3")
-        cmds.undoInfo(openChunk=True)
-        for selVtx in selVtxList:
-            cmds.setAttr(selVtx + ".px", lock = not (cmds.getAttr(selVtx + ".px", lock=True)))
-            cmds.setAttr(selVtx + ".py", lock = not (cmds.getAttr(selVtx + ".py", lock=True)))
-            cmds.setAttr(selVtx + ".pz", lock = not (cmds.getAttr(selVtx + ".pz", lock=True)))
-        cmds.undoInfo(closeChunk=True)
+        #メッシュごとに連続した頂点番号を pnts[a:b] の範囲にまとめて設定する
+        lockCore.toggle()
 
     def on(self):
-        selVtxList = cmds.ls(sl=True, flatten=True, type="float3")
-        cmds.undoInfo(openChunk=True)
-        for selVtx in selVtxList:
-            cmds.setAttr(selVtx + ".px", lock = True)
-            cmds.setAttr(selVtx + ".py", lock = True)
-            cmds.setAttr(selVtx + ".pz", lock = True)
-        cmds.undoInfo(closeChunk=True)
+        lockCore.lock()
 
     def off(self):
-        selVtxList = cmds.ls(sl=True, flatten=True, type="float3")
-        cmds.undoInfo(openChunk=True)
-        for selVtx in selVtxList:
-            cmds.setAttr(selVtx + ".px", lock = False)
-            cmds.setAttr(selVtx + ".py", lock = False)
-            cmds.setAttr(selVtx + ".pz", lock = False)
-        cmds.undoInfo(closeChunk=True)
+        lockCore.unlock()
+
+    def save(self):
+        #選択しているメッシュの全頂点のロック状態をビット列で保存する
+        self.saved_state = lockCore.saveLockState()
+        print('Saved vertex locks of {0} meshes ({1} bytes).'.format(
+            len(self.saved_state), sum(len(blob) for blob in self.saved_state.values())))
+
+    def restore(self):
+        if not self.saved_state:
+            print("ロック状態を保存していません")
+            return
+        #変わる頂点だけを範囲にまとめて設定する
+        lockCore.restoreLockState(self.saved_state)
 
 def main():
     win = CreatePolygonUI()
@@ -6,48 +6,35 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 from maya import cmds
 from maya import mel
 
+from .weightCore import THRESHOLD_WEIGHT, binarizeSkins
+
 """スキンバインドまでを終わらせた段階で、メッシュ選択状態にして実行すれば使用できます。"""
 def main():
-    THRESHOLD_WEIGHT = 0.5
-    FIX_WEIGHT = 1.0
-
     can_fix = True
-    selections = cmds.ls(sl=True) or None
+    selections = cmds.ls(sl=True, objectsOnly=True, long=True) or None
     # 選択物チェック
     if selections is None:
         cmds.warning("Not any selected.")
         can_fix = False
-    # skinClusterチェック&取得
+    # skinClusterチェック&取得(選択したすべてのメッシュ)
+    targets = []
     if can_fix:
-        obj = selections[0]
-        skin_cluster = mel.eval("findRelatedSkinCluster {};".format(obj))
-        if skin_cluster == "":
+        for obj in selections:
+            skin_cluster = mel.eval("findRelatedSkinCluster \"{}\";".format(obj))
+            if skin_cluster == "":
+                cmds.warning("{} does not have skinCluster.".format(obj))
+                continue
+            targets.append((skin_cluster, obj))
+        if not targets:
             cmds.warning("Selected object does not have skinCluster.")
             can_fix = False
 
-    if can_fix:        
-        # ウェイト値が閾値以下のものを削除
-        mel.eval("doPruneSkinClusterWeightsArgList 1 {\""+repr(THRESHOLD_WEIGHT)+"\"};")
-        
-        jnts = cmds.ls(type="joint")
-        cmds.progressWindow(isInterruptable=True, title="Weight Fixing...", maxValue=len(jnts))
-        for jnt in jnts:
-            # スキンインフルエンスの存在確認
-            connections = cmds.listConnections(jnt, destination=True)
-            exists_skinCluster = False
-            for connect in connections:
-                if connect == skin_cluster:
-                    exists_skinCluster = True
-                    break
-            
-            if exists_skinCluster:
-                # 影響を受けている頂点の選択
-                cmds.select(cl=True)
-                cmds.skinCluster(skin_cluster, e=True, selectInfluenceVerts=jnt)
-                # 値を指定値に補正
-                for vtx in cmds.ls(sl=True, fl=True):
-                    if vtx != "{}Shape".format(obj):
-                        cmds.skinPercent(skin_cluster, vtx, transformValue=[(jnt, FIX_WEIGHT)])
-            cmds.progressWindow(edit=True, step = 1)
-        cmds.progressWindow(endProgress=True)
-        cmds.select(cl=True)
\ No newline at end of file
+    if can_fix:
+        # インフルエンスはskinClusterから取得し、全メッシュで同じ索引を使う
+        # ウェイトを 頂点数 x インフルエンス数 の行列でまとめて読み、閾値以上のインフルエンスに指定値で割り当てる
+        # 書き込みは取り消せるようにskinPercentをインフルエンスごとに行うので、時間はインフルエンスの数に比例して増える
+        result = binarizeSkins(targets, threshold=THRESHOLD_WEIGHT)
+        print('Fixed {0} of {1} vertices on {2} meshes ({3} influences) in {4:.3f} sec '
+              '({5} skinPercent writes, one per influence per mesh to keep undo).'.format(
+            result['changed'], result['vertices'], result['meshes'], len(result['influences']), result['seconds'],
+            result['writes']))
\ No newline at end of file
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import timeit
+
+import numpy as np
+
+try:
+    from maya import cmds
+except ImportError:
+    #Mayaの外(テスト)ではFakeSkinBackendを使い、取り消し単位と警告は省く
+    cmds = None
+
+try:
+    import maya.api.OpenMaya as om
+    import maya.api.OpenMayaAnim as oma
+except ImportError:
+    om = None
+    oma = None
+
+from ..common.meshGeometry import formatComponents
+
+#スキンウェイトを 頂点数 x インフルエンス数 の行列でまとめて読み、各頂点を1つのインフルエンスに100%割り当てる
+#書き込みは1回にまとめない. MFnSkinCluster.setWeightsは取り消せない(取り消すにはプラグインのコマンドが必要)ので、
+#取り消せるskinPercentをインフルエンスごとに頂点をまとめて1回ずつ行う(書き込みのコマンドの数は割り当てるインフルエンスの数になる)
+
+#この値以上のウェイトを持つインフルエンスに割り当てる
+THRESHOLD_WEIGHT = 0.5
+#割り当てるウェイト
+FIX_WEIGHT = 1.0
+
+#---------------------------------------.
+# スキンクラスターへの問い合わせのインターフェース.
+#---------------------------------------.
+class SkinBackend(object):
+    #インフルエンス名のリスト(weightsの列の順番)
+    def influences(self, skinCluster):
+        raise NotImplementedError
+    #ウェイトの行列(V,I)
+    def weights(self, skinCluster, mesh):
+        raise NotImplementedError
+    #頂点(V',)をそれぞれインフルエンス(列番号(V',))に100%割り当てる. influencesはinfluences()の結果
+    def assign(self, skinCluster, mesh, vertices, columns, influences):
+        raise NotImplementedError
+
+#---------------------------------------.
+# Maya(OpenMaya API 2.0)のバックエンド.
+# 読み込みはMFnSkinClusterで1回. 書き込みはsetWeightsで1回にすると取り消せないので、skinPercentをインフルエンスごとに1回行う.
+#---------------------------------------.
+class MayaSkinBackend(SkinBackend):
+    def _skin(self, skinCluster):
+        selection = om.MSelectionList()
+        selection.add(skinCluster)
+        return oma.MFnSkinCluster(selection.getDependNode(0))
+
+    def _dag(self, mesh):
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        dag = selection.getDagPath(0)
+        dag.extendToShape()
+        return dag
+
+    def influences(self, skinCluster):
+        return [path.fullPathName() for path in self._skin(skinCluster).influenceObjects()]
+
+    def weights(self, skinCluster, mesh):
+        dag = self._dag(mesh)
+        component = om.MFnSingleIndexedComponent()
+        vertices = component.create(om.MFn.kMeshVertComponent)
+        component.setCompleteData(om.MFnMesh(dag).numVertices)
+        weights, count = self._skin(skinCluster).getWeights(dag, vertices)
+        return np.array(weights, dtype=np.float64).reshape(-1, count)
+
+    def assign(self, skinCluster, mesh, vertices, columns, influences):
+        vertices = np.asarray(vertices, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        for column in np.unique(columns).tolist():
+            components = formatComponents(mesh, 'vtx', vertices[columns == column])
+            cmds.skinPercent(skinCluster, components, transformValue=[(influences[column], FIX_WEIGHT)])
+
+#---------------------------------------.
+# Mayaを使わないバックエンド(テスト用).
+# @param[in] skins --> {スキンクラスター名: (インフルエンス名のリスト, {メッシュ名: ウェイト(V,I)})}.
+#---------------------------------------.
+class FakeSkinBackend(SkinBackend):
+    def __init__(self, skins=None):
+        self.skins = {}
+        for skinCluster, (influences, meshes) in (skins or {}).items():
+            self.skins[skinCluster] = (list(influences),
+                                       dict((mesh, np.array(w, dtype=np.float64)) for mesh, w in meshes.items()))
+        #問い合わせ・書き込みの回数
+        self.calls = 0
+
+    def influences(self, skinCluster):
+        self.calls += 1
+        return list(self.skins[skinCluster][0])
+
+    def weights(self, skinCluster, mesh):
+        self.calls += 1
+        return self.skins[skinCluster][1][mesh].copy()
+
+    def assign(self, skinCluster, mesh, vertices, columns, influences):
+        weights = self.skins[skinCluster][1][mesh]
+        vertices = np.asarray(vertices, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        self.calls += len(np.unique(columns))
+        weights[vertices] = 0.0
+        weights[vertices, columns] = FIX_WEIGHT
+
+_backend = [MayaSkinBackend() if om is not None else None]
+
+#---------------------------------------.
+# 使用するバックエンドを取得/設定.
+#---------------------------------------.
+def getBackend():
+    return _backend[0]
+def setBackend(backend):
+    _backend[0] = backend
+
+#---------------------------------------.
+# 取り消し単位を開く/閉じる(Mayaの外では何もしない).
+#---------------------------------------.
+def _openChunk():
+    if cmds is not None:
+        cmds.undoInfo(openChunk=True)
+def _closeChunk():
+    if cmds is not None:
+        cmds.undoInfo(closeChunk=True)
+
+#---------------------------------------.
+# ウェイトの行列を2値化する(各頂点を割り当てるインフルエンスを決める).
+# 最大のウェイトがthreshold以上の頂点は、そのインフルエンスにFIX_WEIGHT、それ以外に0を割り当てる.
+# @param[in] weights --> ウェイト(V,I).
+# @param[in] threshold --> この値未満のウェイトしか持たない頂点は変更しない.
+# @return (頂点ごとの割り当てるインフルエンスの列番号(V,), 変更する頂点か(V,)). すでに2値の頂点は変更しない.
+#---------------------------------------.
+def binarizeWeights(weights, threshold=THRESHOLD_WEIGHT):
+    weights = np.asarray(weights, dtype=np.float64)
+    if not weights.size:
+        return (np.zeros(len(weights), dtype=np.int64), np.zeros(len(weights), dtype=bool))
+    columns = weights.argmax(axis=1)
+    peak = weights[np.arange(len(weights)), columns]
+    others = weights.sum(axis=1) - peak
+    binary = (np.abs(peak - FIX_WEIGHT) <= 1.0e-9) & (np.abs(others) <= 1.0e-9)
+    return (columns, (peak >= threshold) & ~binary)
+
+#---------------------------------------.
+# スキンクラスターのインフルエンスの索引. 複数のメッシュで共有する.
+# インフルエンスの一覧はスキンクラスターから1回だけ取得し(シーンのジョイントは調べない)、
+# 各スキンクラスターの列番号を全体で共通の番号に対応させる.
+#---------------------------------------.
+class InfluenceIndex(object):
+    def __init__(self):
+        #全体で共通の番号の順のインフルエンス名
+        self.names = []
+        #インフルエンス名 --> 共通の番号
+        self.indices = {}
+        #スキンクラスター名 --> (インフルエンス名のリスト, 列番号 --> 共通の番号(I,))
+        self._skins = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    #---------------------------------------.
+    # スキンクラスターのインフルエンスを登録.
+    # @param[in] skinCluster --> スキンクラスター名.
+    # @return (インフルエンス名のリスト(列の順番), 列番号 --> 共通の番号(I,)).
+    #---------------------------------------.
+    def add(self, skinCluster):
+        if skinCluster not in self._skins:
+            influences = getBackend().influences(skinCluster)
+            for name in influences:
+                if name not in self.indices:
+                    self.indices[name] = len(self.names)
+                    self.names.append(name)
+            self._skins[skinCluster] = (influences, np.array([self.indices[name] for name in influences], dtype=np.int64))
+        return self._skins[skinCluster]
+
+#---------------------------------------.
+# メッシュのスキンウェイトをまとめて2値化する.
+# @param[in] skinCluster --> スキンクラスター名.
+# @param[in] mesh --> メッシュ名.
+# @param[in] threshold --> この値未満のウェイトしか持たない頂点は変更しない.
+# @param[in] index --> 共有するInfluenceIndex(Noneの場合は作る).
+# @return {'vertices', 'changed', 'skipped', 'writes', 'seconds', 'counts'}.
+#         writesは書き込みの回数(割り当てたインフルエンスの数), countsは共通の番号ごとの割り当てた頂点数.
+#---------------------------------------.
+def binarizeSkin(skinCluster, mesh, threshold=THRESHOLD_WEIGHT, index=None):
+    start = timeit.default_timer()
+    backend = getBackend()
+    if index is None:
+        index = InfluenceIndex()
+    influences, to_global = index.add(skinCluster)
+    weights = backend.weights(skinCluster, mesh)
+    columns, changed = binarizeWeights(weights, threshold)
+    skipped = int((weights.max(axis=1) < threshold).sum()) if weights.size else 0
+
+    vertices = np.flatnonzero(changed)
+    if len(vertices):
+        _openChunk()
+        try:
+            backend.assign(skinCluster, mesh, vertices, columns[vertices], influences)
+        finally:
+            _closeChunk()
+    if skipped and cmds is not None:
+        cmds.warning('{0}: {1} vertices have no weight of {2} or more and were left unchanged.'.format(mesh, skipped, threshold))
+    counts = np.bincount(to_global[columns[vertices]], minlength=len(index)) if len(vertices) else np.zeros(len(index), dtype=np.int64)
+    return {'vertices': len(weights), 'changed': len(vertices), 'skipped': skipped,
+            'writes': len(np.unique(columns[vertices])), 'seconds': timeit.default_timer() - start, 'counts': counts}
+
+#---------------------------------------.
+# 複数のメッシュのスキンウェイトをまとめて2値化する(全体で1回の取り消し単位).
+# @param[in] targets --> (スキンクラスター名, メッシュ名)のリスト.
+# @param[in] threshold --> この値未満のウェイトしか持たない頂点は変更しない.
+# @return {'meshes', 'vertices', 'changed', 'skipped', 'writes', 'seconds', 'counts', 'influences'}.
+#---------------------------------------.
+def binarizeSkins(targets, threshold=THRESHOLD_WEIGHT):
+    start = timeit.default_timer()
+    index = InfluenceIndex()
+    results = []
+    _openChunk()
+    try:
+        for skinCluster, mesh in targets:
+            results.append(binarizeSkin(skinCluster, mesh, threshold, index))
+    finally:
+        _closeChunk()
+
+    #メッシュごとの頂点数を共通の番号でまとめる
+    counts = np.zeros(len(index), dtype=np.int64)
+    for result in results:
+        counts[:len(result['counts'])] += result['counts']
+    return {'meshes': len(results),
+            'vertices': sum(result['vertices'] for result in results),
+            'changed': sum(result['changed'] for result in results),
+            'skipped': sum(result['skipped'] for result in results),
+            'writes': sum(result['writes'] for result in results),
+            'seconds': timeit.default_timer() - start,
+            'counts': counts,
+            'influences': list(index.names)}